@@ -1,21 +1,34 @@
 """Configuration settings for the test automation framework"""
 
 import os
-from typing import Dict, Any
 
 class Config:
     """Main configuration class containing all test settings"""
     
-    # Base URL
-    BASE_URL = "https://instylekenya.co.ke/"
+    # Base URL (INSTYLE_BASE_URL points the suite at a staging mirror or local mock)
+    BASE_URL = os.environ.get("INSTYLE_BASE_URL", "https://instylekenya.co.ke/").rstrip("/") + "/"
     
     # Browser settings
     DEFAULT_BROWSER = "chrome"
-    HEADLESS = False
     IMPLICIT_WAIT = 10
     EXPLICIT_WAIT = 20
     PAGE_LOAD_TIMEOUT = 30
     
+    # Shared chromedriver daemon (started by run_tests.py --reuse-browser)
+    REUSE_BROWSER = os.environ.get("INSTYLE_REUSE_BROWSER") == "1"
+    CHROMEDRIVER_URL = os.environ.get("INSTYLE_CHROMEDRIVER_URL", "http://127.0.0.1:9515")
+    
+    # Third-party requests blocked through CDP (analytics, ads, web fonts)
+    BLOCKED_URLS = [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*facebook.net*",
+        "*doubleclick.net*",
+        "*hotjar.com*",
+        "*.woff2",
+        "*.woff"
+    ]
+    
     # Screen resolution
     WINDOW_WIDTH = 1920
     WINDOW_HEIGHT = 1080
@@ -28,6 +41,15 @@ class Config:
         "last_name": "User",
         "phone": "+254700000000"
     }
+    INVALID_USER = {
+        "invalid_email": "not-an-email",
+        "nonexistent_email": "nonexistent.user@example.com",
+        "wrong_password": "WrongPassword123!",
+        "weak_password": "123",
+        "short_password": "Ab1!",
+        "empty_email": "",
+        "empty_password": ""
+    }
     
     # URLs for different pages
     URLS = {
@@ -37,8 +59,12 @@ class Config:
         "cart": f"{BASE_URL}cart",
         "wishlist": f"{BASE_URL}account/wishlist",
         "contact": f"{BASE_URL}pages/contact-us",
-        "about": f"{BASE_URL}pages/about-us"
+        "about": f"{BASE_URL}pages/about-us",
+        "forgot_password": f"{BASE_URL}account/login#recover"
     }
+    HOME_URL = URLS["home"]
+    LOGIN_URL = URLS["login"]
+    FORGOT_URL = URLS["forgot_password"]
     
     # Search terms for testing
     SEARCH_TERMS = [
@@ -57,31 +83,3 @@ class Config:
         "Jewelry",
         "Accessories"
     ]
-    
-    @staticmethod
-    def get_browser_options(browser_name: str) -> Dict[str, Any]:
-        """Get browser-specific options"""
-        options = {
-            "chrome": {
-                "arguments": [
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                    "--window-size=1920,1080"
-                ]
-            },
-            "firefox": {
-                "arguments": [
-                    "--width=1920",
-                    "--height=1080"
-                ]
-            }
-        }
-        
-        if Config.HEADLESS:
-            if browser_name == "chrome":
-                options["chrome"]["arguments"].append("--headless")
-            elif browser_name == "firefox":
-                options["firefox"]["arguments"].append("--headless")
-        
-        return options.get(browser_name, {"arguments": []})
@@ -1,20 +1,92 @@
 """Base page class containing common methods for all page objects"""
 
+from contextlib import contextmanager
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from config.config import Config
 import logging
-import time
+import os
 
 logger = logging.getLogger(__name__)
 
+class _CachedElement:
+    """WebElement stand-in that re-finds its locator once if the element went stale"""
+    
+    def __init__(self, driver: WebDriver, locator: tuple):
+        self._driver = driver
+        self._locator = locator
+        self._element = driver.find_element(*locator)
+    
+    @property
+    def element(self):
+        """The wrapped WebElement, e.g. to pass to execute_script"""
+        return self._element
+    
+    def _refind(self):
+        self._element = self._driver.find_element(*self._locator)
+        return self._element
+    
+    def __getattr__(self, name):
+        try:
+            attr = getattr(self._element, name)
+        except StaleElementReferenceException:
+            attr = getattr(self._refind(), name)
+        if not callable(attr):
+            return attr
+        
+        def call(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            except StaleElementReferenceException:
+                return getattr(self._refind(), name)(*args, **kwargs)
+        return call
+
 class BasePage:
     """Base page class with common functionality for all pages"""
     
+    # Script prelude defining cssMatches(selectorList) for execute_script. Several
+    # locators mix CSS with jQuery's :contains(), which makes querySelectorAll throw
+    # for the whole list; cssMatches then queries each top-level part on its own,
+    # splitting only on commas outside (), [] and quotes so :not(a, b) and
+    # attribute values stay intact.
+    CSS_MATCHES_JS = """
+        const splitSelectorList = sel => {
+            const parts = [];
+            let depth = 0, quote = null, start = 0;
+            for (let i = 0; i < sel.length; i++) {
+                const ch = sel[i];
+                if (quote) {
+                    if (ch === '\\\\') i++;
+                    else if (ch === quote) quote = null;
+                } else if (ch === '"' || ch === "'") {
+                    quote = ch;
+                } else if (ch === '(' || ch === '[') {
+                    depth++;
+                } else if (ch === ')' || ch === ']') {
+                    depth--;
+                } else if (ch === ',' && depth === 0) {
+                    parts.push(sel.slice(start, i));
+                    start = i + 1;
+                }
+            }
+            parts.push(sel.slice(start));
+            return parts.map(part => part.trim()).filter(Boolean);
+        };
+        const cssMatches = sel => {
+            try { return Array.from(document.querySelectorAll(sel)); }
+            catch (e) {
+                return splitSelectorList(sel).flatMap(part => {
+                    try { return Array.from(document.querySelectorAll(part)); }
+                    catch (e) { return []; }
+                });
+            }
+        };
+    """
+    
     def __init__(self, driver: WebDriver):
         """Initialize the base page
         
@@ -24,13 +96,29 @@ class BasePage:
         self.driver = driver
         self.wait = WebDriverWait(driver, Config.EXPLICIT_WAIT)
         self.actions = ActionChains(driver)
+        self._title = None
     
-    def go_to(self, url: str) -> None:
+    def go_to(self, url: str, force: bool = False) -> None:
         """Navigate to a specific URL
         
+        Skips the navigation when the browser is already on the URL and the
+        page has finished parsing; use refresh_page() to reload deliberately.
+        
         Args:
             url: URL to navigate to
+            force: Navigate even if the URL is already loaded
         """
+        # Shared page objects may have cached the title of a page the driver has since left
+        self._title = None
+        if not force:
+            current_url, ready_state = self.driver.execute_script(
+                "return [location.href, document.readyState];"
+            )
+            # The fragment counts: account/login and account/login#recover show different forms
+            if current_url.rstrip("/") == url.rstrip("/") and ready_state != "loading":
+                logger.info(f"Already on: {url}")
+                return
+        
         logger.info(f"Navigating to: {url}")
         self.driver.get(url)
         self.wait_for_page_load()
@@ -44,15 +132,40 @@ class BasePage:
         Returns:
             True if page loaded, False otherwise
         """
+        # Anything that waits for a page load may have changed the title
+        self._title = None
         try:
-            self.wait.until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            # "interactive" is enough: the DOM is parsed, which is what page objects query.
+            # Poll every 100ms so the wait ends close to when the page is actually ready
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script("return document.readyState") in ("interactive", "complete")
             )
             return True
         except TimeoutException:
             logger.warning(f"Page did not load within {timeout} seconds")
             return False
     
+    def wait_for_full_load(self, timeout: int = 30) -> bool:
+        """Wait for the load event, including images and stylesheets
+        
+        The driver uses the eager page load strategy, so navigation returns
+        at DOMContentLoaded; call this when a test needs the fully loaded page.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if page fully loaded, False otherwise
+        """
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
+            return True
+        except TimeoutException:
+            logger.warning(f"Page did not finish loading within {timeout} seconds")
+            return False
+    
     def find_element(self, locator: tuple, timeout: int = None) -> object:
         """Find an element with explicit wait
         
@@ -96,15 +209,25 @@ class BasePage:
             logger.warning(f"Elements not found: {locator}")
             return []
     
-    def is_element_present(self, locator: tuple) -> bool:
+    def is_element_present(self, locator: tuple, timeout: int = 0) -> bool:
         """Check if element is present on the page
         
         Args:
             locator: Tuple of (By, value)
+            timeout: Maximum time to wait; 0 checks once without waiting
             
         Returns:
             True if element is present, False otherwise
         """
+        if timeout:
+            try:
+                WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located(locator)
+                )
+                return True
+            except TimeoutException:
+                return False
+        
         try:
             self.driver.find_element(*locator)
             return True
@@ -121,13 +244,45 @@ class BasePage:
         Returns:
             True if element is visible, False otherwise
         """
+        with self._implicit_wait_disabled():
+            try:
+                WebDriverWait(self.driver, timeout).until(
+                    EC.visibility_of_element_located(locator)
+                )
+                return True
+            except TimeoutException:
+                return False
+    
+    @contextmanager
+    def implicit_wait(self, seconds: float):
+        """Use a different implicit wait inside a with-block
+        
+        The previous value is restored afterwards, even if the block raises.
+        
+        Args:
+            seconds: Implicit wait to apply, e.g. 0 around optional-element probes
+        """
+        # Track the value on the driver instead of asking for it (GET /timeouts);
+        # configure_driver and the driver fixture leave it at 0
+        previous = getattr(self.driver, "_instyle_implicit_wait", 0)
+        if previous == seconds:
+            yield
+            return
+        self.driver.implicitly_wait(seconds)
+        self.driver._instyle_implicit_wait = seconds
         try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located(locator)
-            )
-            return True
-        except TimeoutException:
-            return False
+            yield
+        finally:
+            self.driver.implicitly_wait(previous)
+            self.driver._instyle_implicit_wait = previous
+    
+    def _implicit_wait_disabled(self):
+        """Turn off the implicit wait while an explicit wait polls
+        
+        Otherwise every poll of a missing element also waits out the
+        implicit timeout.
+        """
+        return self.implicit_wait(0)
     
     def click_element(self, locator: tuple, timeout: int = None) -> bool:
         """Click an element with explicit wait
@@ -147,11 +302,36 @@ class BasePage:
                 EC.element_to_be_clickable(locator)
             )
             element.click()
+            self._title = None
             return True
         except TimeoutException:
             logger.error(f"Element not clickable: {locator}")
             return False
     
+    def click_if_present(self, locator: tuple, timeout: float = 2) -> bool:
+        """Click an optional element if it becomes clickable within a short timeout
+        
+        Polls every 100ms and, unlike click_element(), does not log an error
+        when the element is missing.
+        
+        Args:
+            locator: Tuple of (By, value)
+            timeout: Maximum time to wait
+            
+        Returns:
+            True if clicked, False if the element never became clickable
+        """
+        with self._implicit_wait_disabled():
+            try:
+                WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    EC.element_to_be_clickable(locator)
+                ).click()
+            except TimeoutException:
+                logger.info(f"Optional element not clickable: {locator}")
+                return False
+        self._title = None
+        return True
+    
     def send_keys_to_element(self, locator: tuple, text: str, clear: bool = True, timeout: int = None) -> bool:
         """Send keys to an element
         
@@ -232,11 +412,61 @@ class BasePage:
         """
         try:
             element = self.find_element(locator)
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(0.5)  # Small delay for smooth scrolling
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'start', behavior: 'instant'});", element)
+            self.wait_for_animation_frame()
         except Exception as e:
             logger.error(f"Could not scroll to element {locator}: {str(e)}")
     
+    def scroll_to_bottom(self) -> None:
+        """Jump to the bottom of the page in a single scroll"""
+        self.driver.execute_script(
+            "window.scrollTo({top: document.body.scrollHeight, behavior: 'instant'});"
+        )
+        self.wait_for_animation_frame()
+    
+    def scroll_to_top(self) -> None:
+        """Jump to the top of the page in a single scroll"""
+        self.driver.execute_script("window.scrollTo({top: 0, behavior: 'instant'});")
+        self.wait_for_animation_frame()
+    
+    def set_viewport(self, width: int, height: int, mobile: bool = False) -> None:
+        """Emulate a viewport size without resizing the browser window
+        
+        Uses CDP device metrics where available (no window-manager round
+        trip) and falls back to set_window_size on other drivers.
+        
+        Args:
+            width: Viewport width in CSS pixels
+            height: Viewport height in CSS pixels
+            mobile: Emulate a mobile device (touch viewport, meta viewport)
+        """
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": width,
+                "height": height,
+                "deviceScaleFactor": 2 if mobile else 1,
+                "mobile": mobile
+            })
+        else:
+            self.driver.set_window_size(width, height)
+    
+    def reset_viewport(self) -> None:
+        """Undo set_viewport() and restore the configured window size"""
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        else:
+            self.driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
+    
+    def wait_for_animation_frame(self) -> None:
+        """Wait until the browser has rendered the next frame"""
+        try:
+            self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "requestAnimationFrame(() => done());"
+            )
+        except Exception as e:
+            logger.debug(f"Animation frame wait failed: {str(e)}")
+    
     def hover_over_element(self, locator: tuple) -> bool:
         """Hover over an element
         
@@ -272,13 +502,32 @@ class BasePage:
         except TimeoutException:
             return False
     
+    def wait_until(self, condition, timeout: int = 10, poll_frequency: float = 0.5) -> bool:
+        """Wait for an expected condition instead of sleeping a fixed time
+        
+        Args:
+            condition: Expected condition or callable taking the driver
+            timeout: Maximum time to wait
+            poll_frequency: Seconds between checks of the condition
+            
+        Returns:
+            True if the condition was met, False otherwise
+        """
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=poll_frequency).until(condition)
+            return True
+        except TimeoutException:
+            return False
+    
     def get_page_title(self) -> str:
-        """Get the current page title
+        """Get the current page title, cached until the next go_to(), click or page load wait
         
         Returns:
             Page title
         """
-        return self.driver.title
+        if self._title is None:
+            self._title = self.driver.title
+        return self._title
     
     def get_current_url(self) -> str:
         """Get the current URL
@@ -288,6 +537,133 @@ class BasePage:
         """
         return self.driver.current_url
     
+    def page_contains_error(self) -> bool:
+        """Check the rendered page text for not-found/error wording
+        
+        Runs in the browser so only a boolean crosses the WebDriver wire.
+        
+        Returns:
+            True if the page mentions 404, "not found" or "error"
+        """
+        return self.driver.execute_script(
+            "const t = document.body.innerText.toLowerCase();"
+            "return t.includes('404') || t.includes('not found') || t.includes('error');"
+        )
+    
+    def page_shows_server_error(self) -> bool:
+        """Check whether the page looks like a server error page
+        
+        Returns:
+            True if the title mentions 500 or the page text mentions "error"
+        """
+        return self.driver.execute_script(
+            "return document.title.includes('500') ||"
+            " document.body.innerText.toLowerCase().includes('error');"
+        )
+    
+    def js_collect(self, locator: tuple, fields: dict, within: tuple = None, visible_only: bool = False,
+                   timeout: int = None) -> list:
+        """Read properties from every matching element in one script call
+        
+        Like find_elements(), first waits for the elements (or the within
+        container) to be present, since the eager page load strategy can
+        return before late-rendered content exists.
+        
+        Args:
+            locator: CSS locator tuple for the elements to collect
+            fields: Mapping of name -> (child CSS selector or None, property),
+                e.g. {"href": (None, "href"), "price": (".price", "innerText")}
+            within: Optional CSS locator tuple; only its first match is searched
+            visible_only: Skip elements that are not rendered
+            timeout: Maximum time to wait for presence; 0 collects without waiting
+            
+        Returns:
+            One dict per element; a field is None when its child is missing
+        """
+        if timeout is None:
+            timeout = Config.EXPLICIT_WAIT
+        if timeout and not self.is_element_present(within or locator, timeout):
+            logger.warning(f"Elements not found: {within or locator}")
+            return []
+        
+        return self.driver.execute_script(
+            "const [sel, fields, withinSel, visibleOnly] = arguments;"
+            "const root = withinSel ? document.querySelector(withinSel) : document;"
+            "if (!root) return [];"
+            "return Array.from(root.querySelectorAll(sel))"
+            "  .filter(el => !visibleOnly || el.getClientRects().length > 0)"
+            "  .map(el => {"
+            "    const row = {};"
+            "    for (const [name, [childSel, prop]] of Object.entries(fields)) {"
+            "      const target = childSel ? el.querySelector(childSel) : el;"
+            "      const value = target ? target[prop] : null;"
+            "      row[name] = typeof value === 'string' ? value.trim() : (value ?? null);"
+            "    }"
+            "    return row;"
+            "  });",
+            locator[1],
+            fields,
+            within[1] if within else None,
+            visible_only
+        )
+    
+    def snapshot_form(self, form_locator: tuple, fields: dict = None) -> dict:
+        """Read a form's attributes and related elements in one script call
+        
+        Args:
+            form_locator: CSS locator tuple for the form
+            fields: Optional mapping of name -> CSS locator tuple, looked up
+                anywhere in the document
+            
+        Returns:
+            Dict with "found", "method" and "hidden_inputs" for the form, plus
+            one key per field holding its trimmed text ("" for inputs) or
+            None if the field is absent
+        """
+        fields = fields or {}
+        return self.driver.execute_script(
+            "const [formSel, fieldSels] = arguments;"
+            "const form = document.querySelector(formSel);"
+            "const snapshot = {"
+            "  found: form !== null,"
+            "  method: form ? form.getAttribute('method') : null,"
+            "  hidden_inputs: form ? form.querySelectorAll('input[type=hidden]').length : 0"
+            "};"
+            "for (const [name, sel] of Object.entries(fieldSels)) {"
+            "  const el = document.querySelector(sel);"
+            "  snapshot[name] = el ? (el.innerText || '').trim() : null;"
+            "}"
+            "return snapshot;",
+            form_locator[1],
+            {name: locator[1] for name, locator in fields.items()}
+        )
+    
+    def probe_url_statuses(self, urls) -> list:
+        """Fetch several URLs in parallel from the page without rendering them
+        
+        The requests run through fetch() in the current page, so they share
+        the browser's cookies. The browser should already be on the site.
+        
+        Args:
+            urls: Iterable of absolute URLs
+            
+        Returns:
+            List of dicts with url, status, redirected and error_body keys,
+            in the same order as urls
+        """
+        return self.driver.execute_async_script(
+            "const done = arguments[arguments.length - 1];"
+            "Promise.all(arguments[0].map(u => fetch(u, {credentials: 'same-origin'})"
+            "  .then(r => r.text().then(t => {"
+            "    const body = t.toLowerCase();"
+            "    return {url: u, status: r.status, redirected: r.redirected,"
+            "            error_body: body.includes('404') || body.includes('not found')};"
+            "  }))"
+            "  .catch(e => ({url: u, status: 0, redirected: false, error_body: false}))"
+            ")).then(done);",
+            list(urls)
+        )
+    
     def refresh_page(self) -> None:
         """Refresh the current page"""
         self.driver.refresh()
@@ -298,6 +674,25 @@ class BasePage:
         self.driver.back()
         self.wait_for_page_load()
     
+    def history_back_to(self, url: str, timeout: int = 10) -> bool:
+        """Go back in history and wait until the browser is on url again
+        
+        Cheaper than re-opening the page, since the browser can restore it
+        from its back/forward cache.
+        
+        Args:
+            url: URL the previous history entry is expected to have
+            timeout: Maximum time to wait
+            
+        Returns:
+            True if the browser returned to url, False otherwise
+        """
+        self.driver.execute_script("history.back();")
+        # A back/forward cache restore swaps the page in within a few ms, so poll quickly
+        if not self.wait_until(EC.url_to_be(url), timeout, poll_frequency=0.05):
+            return False
+        return self.wait_for_page_load()
+    
     def take_screenshot(self, filename: str) -> str:
         """Take a screenshot of the current page
         
@@ -307,6 +702,10 @@ class BasePage:
         Returns:
             Path to the screenshot file
         """
+        # Prefix the pytest-xdist worker id so parallel workers never overwrite each other
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker_id:
+            filename = f"{worker_id}_{filename}"
         screenshot_path = f"screenshots/{filename}"
         try:
             self.driver.save_screenshot(screenshot_path)
@@ -1,6 +1,7 @@
 """Cart page object model"""
 
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 from pages.base_page import BasePage
 from config.config import Config
 import logging
@@ -55,6 +56,9 @@ class CartPage(BasePage):
     # Notes
     ORDER_NOTES = (By.CSS_SELECTOR, "textarea[name*='note'], #order_notes, .cart__notes")
     
+    # Messages
+    ERROR_MESSAGE = (By.CSS_SELECTOR, ".cart__error, .cart-error, .errors")
+    
     def __init__(self, driver):
         """Initialize cart page
         
@@ -62,12 +66,54 @@ class CartPage(BasePage):
             driver: WebDriver instance
         """
         super().__init__(driver)
+        self._rows = None
         
     def load(self):
         """Load the cart page"""
         self.go_to(Config.URLS["cart"])
+        self._rows = None
         return self
     
+    def _get_rows(self, refresh: bool = False) -> list:
+        """Get the cart row elements, cached until the cart changes
+        
+        Args:
+            refresh: Re-query the rows even if they are cached
+            
+        Returns:
+            List of cart row WebElements
+        """
+        if self._rows is None or refresh:
+            self._rows = self.driver.find_elements(*self.CART_ITEMS)
+        return self._rows
+    
+    def _item_control(self, item_index: int, locator: tuple):
+        """Find a control inside a cart row, using the cached rows
+        
+        Falls back to the page-wide list of matching controls when the
+        theme renders them outside the row.
+        
+        Args:
+            item_index: Index of the item (0-based)
+            locator: Tuple of (By, value) for the control
+            
+        Returns:
+            WebElement, or None if the item has no such control
+        """
+        for refresh in (False, True):
+            rows = self._get_rows(refresh)
+            if item_index >= len(rows):
+                break
+            try:
+                return rows[item_index].find_element(*locator)
+            except StaleElementReferenceException:
+                continue
+            except NoSuchElementException:
+                break
+        
+        controls = self.driver.find_elements(*locator)
+        return controls[item_index] if item_index < len(controls) else None
+    
     def is_loaded(self) -> bool:
         """Check if cart page is loaded
         
@@ -84,8 +130,48 @@ class CartPage(BasePage):
         Returns:
             True if cart is empty, False otherwise
         """
-        return (self.is_element_visible(self.EMPTY_CART_MESSAGE) or 
-                len(self.find_elements(self.CART_ITEMS)) == 0)
+        return self.probe_features()["is_empty"]
+    
+    def probe_features(self) -> dict:
+        """Check cart emptiness and optional cart widgets with a single script call
+        
+        Returns:
+            Dictionary with is_empty, checkout_button, coupon_input,
+            shipping_calculator and order_notes booleans
+        """
+        script = """
+            const [itemSel, emptySel, checkoutSel, couponSel, shippingSel, notesSel] = arguments;
+            const present = sel => document.querySelector(sel) !== null;
+            const message = document.querySelector(emptySel);
+            return {
+                is_empty: (message !== null && message.offsetParent !== null) ||
+                    document.querySelectorAll(itemSel).length === 0,
+                checkout_button: present(checkoutSel),
+                coupon_input: present(couponSel),
+                shipping_calculator: present(shippingSel),
+                order_notes: present(notesSel)
+            };
+        """
+        try:
+            return self.driver.execute_script(
+                script,
+                self.CART_ITEMS[1],
+                self.EMPTY_CART_MESSAGE[1],
+                self.CHECKOUT_BUTTON[1],
+                self.COUPON_INPUT[1],
+                self.SHIPPING_CALCULATOR[1],
+                self.ORDER_NOTES[1],
+            )
+        except Exception as e:
+            logger.warning(f"Feature probe script failed, falling back to element lookups: {str(e)}")
+            return {
+                "is_empty": (self.is_element_visible(self.EMPTY_CART_MESSAGE) or
+                             len(self.find_elements(self.CART_ITEMS)) == 0),
+                "checkout_button": self.is_element_present(self.CHECKOUT_BUTTON),
+                "coupon_input": self.is_element_present(self.COUPON_INPUT),
+                "shipping_calculator": self.is_element_present(self.SHIPPING_CALCULATOR),
+                "order_notes": self.is_element_present(self.ORDER_NOTES),
+            }
     
     def get_cart_items(self) -> list:
         """Get all items in the cart
@@ -131,6 +217,68 @@ class CartPage(BasePage):
             
         return items
     
+    def get_cart_items_fast(self, keep_incomplete: bool = False) -> list:
+        """Get all items in the cart with a single script call
+        
+        Same result as get_cart_items(), but reads every field in the
+        browser instead of issuing several WebDriver commands per item.
+        
+        Args:
+            keep_incomplete: Keep rows missing a field (as None) so list
+                indexes line up with the rows on the page
+            
+        Returns:
+            List of cart item dictionaries
+        """
+        script = """
+            const [itemSel, nameSel, priceSel, qtySel, imgSel] = arguments;
+            return [...document.querySelectorAll(itemSel)].map(item => {
+                const name = item.querySelector(nameSel);
+                const price = item.querySelector(priceSel);
+                const quantity = item.querySelector(qtySel);
+                const image = item.querySelector(imgSel);
+                return {
+                    name: name ? name.innerText.trim() : null,
+                    price: price ? price.innerText.trim() : null,
+                    quantity: quantity ? quantity.value : null,
+                    image_src: image ? image.src : null
+                };
+            });
+        """
+        try:
+            items = self.driver.execute_script(
+                script,
+                self.CART_ITEMS[1],
+                self.PRODUCT_NAMES[1],
+                self.PRODUCT_PRICES[1],
+                self.QUANTITY_INPUTS[1],
+                self.PRODUCT_IMAGES[1],
+            ) or []
+        except Exception as e:
+            logger.error(f"Failed to get cart items: {str(e)}")
+            return []
+        if keep_incomplete:
+            return items
+        return [item for item in items if None not in item.values()]
+    
+    def get_cart_snapshot_js(self) -> list:
+        """Get name, price and numeric quantity of every cart row in one script call
+        
+        Unlike get_cart_items_fast(), rows missing a field are kept with
+        empty values, so list indexes line up with the rows on the page.
+        
+        Returns:
+            List of dictionaries with name, price and qty keys
+        """
+        snapshot = []
+        for item in self.get_cart_items_fast(keep_incomplete=True):
+            try:
+                qty = int(item["quantity"])
+            except (TypeError, ValueError):
+                qty = 0
+            snapshot.append({"name": item["name"] or "", "price": item["price"] or "", "qty": qty})
+        return snapshot
+    
     def get_cart_item_count(self) -> int:
         """Get the number of items in cart
         
@@ -153,22 +301,22 @@ class CartPage(BasePage):
             True if quantity was updated, False otherwise
         """
         try:
-            quantity_inputs = self.find_elements(self.QUANTITY_INPUTS)
+            quantity_input = self._item_control(item_index, self.QUANTITY_INPUTS)
             
-            if item_index < len(quantity_inputs):
-                quantity_input = quantity_inputs[item_index]
+            if quantity_input is not None:
                 quantity_input.clear()
                 quantity_input.send_keys(str(new_quantity))
                 
                 # Look for update button
-                update_buttons = self.find_elements(self.UPDATE_QUANTITY_BUTTONS)
-                if update_buttons and item_index < len(update_buttons):
-                    update_buttons[item_index].click()
+                update_button = self._item_control(item_index, self.UPDATE_QUANTITY_BUTTONS)
+                if update_button is not None:
+                    update_button.click()
                 else:
                     # Try pressing Enter if no update button
                     from selenium.webdriver.common.keys import Keys
                     quantity_input.send_keys(Keys.RETURN)
                 
+                self._rows = None
                 self.wait_for_page_load()
                 return True
             
@@ -188,10 +336,11 @@ class CartPage(BasePage):
             True if quantity was increased, False otherwise
         """
         try:
-            increase_buttons = self.find_elements(self.QUANTITY_INCREASE_BUTTONS)
+            increase_button = self._item_control(item_index, self.QUANTITY_INCREASE_BUTTONS)
             
-            if item_index < len(increase_buttons):
-                increase_buttons[item_index].click()
+            if increase_button is not None:
+                increase_button.click()
+                self._rows = None
                 self.wait_for_page_load()
                 return True
             
@@ -211,10 +360,11 @@ class CartPage(BasePage):
             True if quantity was decreased, False otherwise
         """
         try:
-            decrease_buttons = self.find_elements(self.QUANTITY_DECREASE_BUTTONS)
+            decrease_button = self._item_control(item_index, self.QUANTITY_DECREASE_BUTTONS)
             
-            if item_index < len(decrease_buttons):
-                decrease_buttons[item_index].click()
+            if decrease_button is not None:
+                decrease_button.click()
+                self._rows = None
                 self.wait_for_page_load()
                 return True
             
@@ -234,10 +384,11 @@ class CartPage(BasePage):
             True if item was removed, False otherwise
         """
         try:
-            remove_buttons = self.find_elements(self.REMOVE_ITEM_BUTTONS)
+            remove_button = self._item_control(item_index, self.REMOVE_ITEM_BUTTONS)
             
-            if item_index < len(remove_buttons):
-                remove_buttons[item_index].click()
+            if remove_button is not None:
+                remove_button.click()
+                self._rows = None
                 self.wait_for_page_load()
                 return True
             
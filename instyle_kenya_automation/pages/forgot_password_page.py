@@ -1,6 +1,7 @@
 """Forgot password page object model"""
 
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
 from pages.base_page import BasePage
 import logging
 
@@ -40,8 +41,9 @@ class ForgotPasswordPage(BasePage):
         Returns:
             True if page is loaded, False otherwise
         """
-        return ("forgot" in self.get_current_url().lower() or 
-                "recover" in self.get_current_url().lower() or
+        current_url = self.get_current_url().lower()
+        return ("forgot" in current_url or 
+                "recover" in current_url or
                 self.is_element_visible(self.EMAIL_INPUT))
     
     def reset_password(self, email: str) -> bool:
@@ -67,13 +69,20 @@ class ForgotPasswordPage(BasePage):
             # Wait for page to load
             self.wait_for_page_load()
             
+            # Wait once for whichever message appears first, rather than
+            # waiting out the success timeout on every error path
+            self.wait_until(EC.any_of(
+                EC.visibility_of_element_located(self.SUCCESS_MESSAGE),
+                EC.visibility_of_element_located(self.ERROR_MESSAGE)
+            ), timeout=5)
+            
             # Check for success message
-            if self.is_element_visible(self.SUCCESS_MESSAGE, timeout=5):
+            if self.is_element_visible(self.SUCCESS_MESSAGE, timeout=0):
                 logger.info("Password reset request submitted successfully")
                 return True
             
             # Check for error message
-            if self.is_element_visible(self.ERROR_MESSAGE, timeout=3):
+            if self.is_element_visible(self.ERROR_MESSAGE, timeout=0):
                 error_text = self.get_element_text(self.ERROR_MESSAGE)
                 logger.error(f"Password reset failed with error: {error_text}")
                 return False
@@ -101,6 +110,20 @@ class ForgotPasswordPage(BasePage):
         """
         return self.get_element_text(self.INSTRUCTIONS)
     
+    def get_form_snapshot(self) -> dict:
+        """Read the reset form and its surrounding elements in one round trip
+        
+        Returns:
+            Dict from snapshot_form() with email_input, submit_button,
+            page_title and instructions keys
+        """
+        return self.snapshot_form(self.FORM, {
+            "email_input": self.EMAIL_INPUT,
+            "submit_button": self.SUBMIT_BUTTON,
+            "page_title": self.PAGE_TITLE,
+            "instructions": self.INSTRUCTIONS
+        })
+    
     def get_success_message(self) -> str:
         """Get success message if present
         
@@ -108,7 +131,8 @@ class ForgotPasswordPage(BasePage):
             Success message text or empty string
         """
         try:
-            if self.is_element_visible(self.SUCCESS_MESSAGE, timeout=3):
+            # reset_password() already waited for the response message
+            if self.is_element_visible(self.SUCCESS_MESSAGE, timeout=1):
                 return self.get_element_text(self.SUCCESS_MESSAGE)
             return ""
         except Exception:
@@ -121,12 +145,31 @@ class ForgotPasswordPage(BasePage):
             Error message text or empty string
         """
         try:
-            if self.is_element_visible(self.ERROR_MESSAGE, timeout=3):
+            # reset_password() already waited for the response message
+            if self.is_element_visible(self.ERROR_MESSAGE, timeout=1):
                 return self.get_element_text(self.ERROR_MESSAGE)
             return ""
         except Exception:
             return ""
     
+    def get_feedback(self) -> dict:
+        """Read the success and error messages in one round trip, without waiting
+        
+        Call after reset_password(), which already waits for a response message.
+        
+        Returns:
+            Dict with "success" and "error" texts; "" when that message is not showing
+        """
+        return self.driver.execute_script(
+            "const text = sel => {"
+            "  const el = document.querySelector(sel);"
+            "  return el && el.offsetParent !== null ? el.innerText.trim() : '';"
+            "};"
+            "return {success: text(arguments[0]), error: text(arguments[1])};",
+            self.SUCCESS_MESSAGE[1],
+            self.ERROR_MESSAGE[1]
+        )
+    
     def click_back_to_login(self) -> bool:
         """Click back to login link
         
@@ -157,6 +200,21 @@ class ForgotPasswordPage(BasePage):
         except Exception as e:
             logger.error(f"Failed to clear email field: {str(e)}")
     
+    def is_form_ready_for_resubmit(self) -> bool:
+        """Check whether the form can take another request
+        
+        Returns:
+            True if the email field is empty or no success message is showing
+        """
+        return self.driver.execute_script(
+            "const input = document.querySelector(arguments[0]);"
+            "const success = document.querySelector(arguments[1]);"
+            "return (input !== null && input.value === '') ||"
+            " success === null || success.offsetParent === null;",
+            self.EMAIL_INPUT[1],
+            self.SUCCESS_MESSAGE[1]
+        )
+    
     def is_form_valid(self) -> bool:
         """Check if the form appears to be valid/complete
         
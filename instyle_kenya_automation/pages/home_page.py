@@ -75,7 +75,8 @@ class HomePage(BasePage):
         Returns:
             True if page is loaded, False otherwise
         """
-        return self.is_element_visible(self.LOGO) and "instyle" in self.get_page_title().lower()
+        # Presence, not visibility: on the image-free browser the logo <img> may have no layout
+        return self.is_element_present(self.LOGO, timeout=5) and "instyle" in self.get_page_title().lower()
     
     def search_for_product(self, search_term: str) -> bool:
         """Search for a product
@@ -111,36 +112,21 @@ class HomePage(BasePage):
         Returns:
             List of product information dictionaries
         """
-        products = []
         try:
-            product_cards = self.find_elements(self.PRODUCT_CARDS)
-            
-            for card in product_cards[:10]:  # Limit to first 10 products
-                try:
-                    # Get product title
-                    title_element = card.find_element(*self.PRODUCT_TITLES)
-                    title = title_element.text if title_element else "No title"
-                    
-                    # Get product price
-                    price_element = card.find_element(*self.PRODUCT_PRICES)
-                    price = price_element.text if price_element else "No price"
-                    
-                    # Get product image
-                    image_element = card.find_element(*self.PRODUCT_IMAGES)
-                    image_src = image_element.get_attribute("src") if image_element else ""
-                    
-                    products.append({
-                        "title": title,
-                        "price": price,
-                        "image_src": image_src
-                    })
-                except Exception as e:
-                    logger.warning(f"Could not extract product info: {str(e)}")
-                    continue
-                    
+            cards = self.js_collect(self.PRODUCT_CARDS, {
+                "title": (self.PRODUCT_TITLES[1], "innerText"),
+                "price": (self.PRODUCT_PRICES[1], "innerText"),
+                "image_src": (self.PRODUCT_IMAGES[1], "src")
+            })
         except Exception as e:
             logger.error(f"Failed to get featured products: {str(e)}")
-            
+            return []
+        
+        # Limit to first 10 products; cards missing a title, price or image are skipped
+        cards = cards[:10]
+        products = [card for card in cards if None not in card.values()]
+        if len(products) < len(cards):
+            logger.warning(f"Could not extract product info for {len(cards) - len(products)} cards")
         return products
     
     def click_product_category(self, category: str) -> bool:
@@ -248,6 +234,42 @@ class HomePage(BasePage):
         """
         return self.click_element(self.HERO_CTA_BUTTON)
     
+    def get_category_urls(self, categories: list) -> dict:
+        """Resolve the menu link of several categories in one script call
+        
+        Args:
+            categories: Category names (dresses, shoes, bags, jewelry, accessories)
+            
+        Returns:
+            Dict of category -> link URL, or None if the category has no link
+        """
+        category_locators = {
+            "dresses": self.MENU_DRESSES,
+            "shoes": self.MENU_SHOES,
+            "bags": self.MENU_BAGS,
+            "jewelry": self.MENU_JEWELRY,
+            "accessories": self.MENU_ACCESSORIES
+        }
+        selectors = {
+            category: category_locators[category.lower()][1]
+            for category in categories if category.lower() in category_locators
+        }
+        try:
+            urls = self.driver.execute_script(
+                self.CSS_MATCHES_JS +
+                "const urls = {};"
+                "for (const [category, selector] of Object.entries(arguments[0])) {"
+                "  const link = cssMatches(selector).find(el => el.href);"
+                "  urls[category] = link ? link.href : null;"
+                "}"
+                "return urls;",
+                selectors
+            )
+        except Exception as e:
+            logger.error(f"Could not resolve category links: {str(e)}")
+            urls = {}
+        return {category: urls.get(category) for category in categories}
+    
     def get_navigation_links(self) -> list:
         """Get all navigation links
         
@@ -255,9 +277,9 @@ class HomePage(BasePage):
             List of navigation link texts
         """
         try:
-            nav_element = self.find_element(self.MAIN_NAVIGATION)
-            links = nav_element.find_elements(By.TAG_NAME, "a")
-            return [link.text for link in links if link.text.strip()]
+            links = self.js_collect((By.CSS_SELECTOR, "a"), {"text": (None, "innerText")},
+                                    within=self.MAIN_NAVIGATION, visible_only=True)
+            return [link["text"] for link in links if link["text"]]
         except Exception as e:
             logger.error(f"Could not get navigation links: {str(e)}")
             return []
@@ -286,8 +308,8 @@ class HomePage(BasePage):
             List of social media URLs
         """
         try:
-            social_elements = self.find_elements(self.SOCIAL_LINKS)
-            return [link.get_attribute("href") for link in social_elements if link.get_attribute("href")]
+            links = self.js_collect(self.SOCIAL_LINKS, {"href": (None, "href")})
+            return [link["href"] for link in links if link["href"]]
         except Exception as e:
             logger.error(f"Could not get social media links: {str(e)}")
             return []
@@ -1,7 +1,11 @@
 """Login page object model"""
 
 from selenium.webdriver.common.by import By
-from pages.base_page import BasePage
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+from pages.base_page import BasePage, _CachedElement
+from pages.forgot_password_page import ForgotPasswordPage
+from pages.registration_page import RegistrationPage
 from config.config import Config
 import logging
 
@@ -22,9 +26,20 @@ class LoginPage(BasePage):
     FORGOT_PASSWORD_LINK = (By.CSS_SELECTOR, "a[href*='forgot'], a[href*='recover'], a:contains('Forgot')")
     CREATE_ACCOUNT_LINK = (By.CSS_SELECTOR, "a[href*='register'], a[href*='signup'], a:contains('Create'), a:contains('Sign up')")
     
+    # Registration ("Create account" opens the register form) and social sign-in
+    REGISTER_TAB = (By.CSS_SELECTOR, "a[href*='register'], a[href*='signup']")
+    REGISTER_EMAIL = (By.CSS_SELECTOR, "#create_customer input[type='email'], .register-form input[type='email']")
+    REGISTER_BUTTON = (By.CSS_SELECTOR, "#create_customer [type='submit'], .register-form [type='submit']")
+    GOOGLE_LOGIN = (By.CSS_SELECTOR, "a[href*='google'], [data-provider='google'], .social-login--google")
+    FACEBOOK_LOGIN = (By.CSS_SELECTOR, "a[href*='facebook.com/dialog'], [data-provider='facebook'], .social-login--facebook")
+    
     # Error and success messages
     ERROR_MESSAGE = (By.CSS_SELECTOR, ".error, .alert-error, .form__message--error, .errors")
     SUCCESS_MESSAGE = (By.CSS_SELECTOR, ".success, .alert-success, .form__message--success")
+    VALIDATION_ERROR = (By.CSS_SELECTOR, ".validation-error, .field-error, [aria-invalid='true']")
+    
+    # Shown in the header only to signed-in customers
+    LOGOUT_LINK = (By.CSS_SELECTOR, "a[href*='logout']")
     
     # Page elements
     LOGIN_FORM = (By.CSS_SELECTOR, "form, .login-form, #customer_login")
@@ -37,12 +52,85 @@ class LoginPage(BasePage):
             driver: WebDriver instance
         """
         super().__init__(driver)
+        self._element_cache = {}
         
     def load(self):
-        """Load the login page"""
-        self.go_to(Config.URLS["login"])
+        """Load the login page, skipping the navigation if it is already open"""
+        self._element_cache.clear()
+        self.go_to(Config.LOGIN_URL)
         return self
     
+    def find_element_cached(self, locator: tuple):
+        """Find an element once and reuse it until the next load()
+        
+        The cached element re-finds its locator if the page has replaced it.
+        
+        Args:
+            locator: Tuple of (By, value)
+            
+        Returns:
+            WebElement stand-in for the locator
+        """
+        element = self._element_cache.get(locator)
+        if element is None:
+            element = self._element_cache[locator] = _CachedElement(self.driver, locator)
+        return element
+    
+    def reset(self) -> bool:
+        """Reset the login form in place instead of reloading the page
+        
+        Returns:
+            True if the form was reset, False otherwise
+        """
+        try:
+            # Reset the form that owns the email field; forms[0] may be a header search form
+            return self.driver.execute_script(
+                "const input = document.querySelector(arguments[0]);"
+                "if (!input || !input.form) return false;"
+                "input.form.reset();"
+                "return true;",
+                self.EMAIL_INPUT[1]
+            )
+        except Exception as e:
+            logger.error(f"Failed to reset login form: {str(e)}")
+            return False
+    
+    def probe_elements(self, locators: dict) -> dict:
+        """Check which of several elements are visible in one script call
+        
+        Unlike is_element_visible(), absent elements do not wait out a timeout.
+        
+        Args:
+            locators: Mapping of name -> CSS or XPath locator tuple
+            
+        Returns:
+            Mapping of name -> True if any element matching the locator is visible
+        """
+        queries = {
+            name: ("xpath" if by == By.XPATH else "css", value)
+            for name, (by, value) in locators.items()
+        }
+        try:
+            return self.driver.execute_script(
+                self.CSS_MATCHES_JS +
+                "const isVisible = el => el.getClientRects().length > 0 &&"
+                "  getComputedStyle(el).visibility !== 'hidden';"
+                "const xpathMatches = expr => {"
+                "  const result = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);"
+                "  return Array.from({length: result.snapshotLength}, (_, i) => result.snapshotItem(i));"
+                "};"
+                "const found = {};"
+                "for (const [name, [kind, value]] of Object.entries(arguments[0])) {"
+                "  const matches = kind === 'xpath' ? xpathMatches(value) : cssMatches(value);"
+                "  found[name] = matches.some(isVisible);"
+                "}"
+                "return found;",
+                queries
+            )
+        except Exception as e:
+            logger.error(f"Failed to probe elements: {str(e)}")
+            return {name: False for name in locators}
+    
     def is_loaded(self) -> bool:
         """Check if login page is loaded
         
@@ -85,7 +173,7 @@ class LoginPage(BasePage):
                 return False
             
             # Wait for page to load
-            self.wait_for_page_load()
+            self.await_navigation()
             
             # Check if login was successful (redirected away from login page)
             if "login" not in self.get_current_url().lower():
@@ -104,6 +192,151 @@ class LoginPage(BasePage):
             logger.error(f"Login failed with exception: {str(e)}")
             return False
     
+    def await_navigation(self, timeout: int = 10) -> bool:
+        """Wait for the page to finish parsing with one event-driven script call
+        
+        Resolves on DOMContentLoaded, like wait_for_page_load(), but the
+        browser reports it instead of the readyState being polled.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if the page finished parsing, False otherwise
+        """
+        self._title = None
+        # The script enforces its own deadline, so the driver's script timeout
+        # (30s by default) needn't be changed around the call
+        try:
+            loaded = self.driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "if (document.readyState !== 'loading') { done(true); return; }"
+                "setTimeout(() => done(false), arguments[0]);"
+                "document.addEventListener('DOMContentLoaded', () => done(true), {once: true});",
+                timeout * 1000
+            )
+        except TimeoutException:
+            loaded = False
+        except JavascriptException:
+            # The script ran in a document that was unloading; poll the new one instead
+            return self.wait_for_page_load(timeout)
+        
+        if not loaded:
+            logger.warning(f"Page did not load within {timeout} seconds")
+        return loaded
+    
+    def fast_type(self, locator: tuple, text: str) -> bool:
+        """Set a field's value in one script call instead of typing it
+        
+        Fires the focus, input, change and blur events typing would, so
+        listeners on the form still see the value. Use send_keys_to_element()
+        when a test needs real key presses, e.g. Enter to submit.
+        
+        Args:
+            locator: Tuple of (By, value) for the input
+            text: Value to set
+            
+        Returns:
+            True if the value was set, False otherwise
+        """
+        script = (
+            "const [el, text] = arguments;"
+            "el.focus();"
+            # Use the native setter so framework-managed inputs notice the change
+            "Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set.call(el, text);"
+            "el.dispatchEvent(new Event('input', {bubbles: true}));"
+            "el.dispatchEvent(new Event('change', {bubbles: true}));"
+            "el.blur();"
+        )
+        try:
+            try:
+                self.driver.execute_script(script, self.find_element_cached(locator).element, text)
+            except StaleElementReferenceException:
+                # The page replaced the field since it was cached; find it again
+                self._element_cache.pop(locator, None)
+                self.driver.execute_script(script, self.find_element_cached(locator).element, text)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set value of {locator}: {str(e)}")
+            return False
+    
+    def submit_and_observe(self, email: str, password: str, timeout: int = 5) -> dict:
+        """Fill in and submit the login form, then report where it ended up
+        
+        Filling and submitting take one script call and each poll of the
+        outcome another, instead of separate type, click, URL and error reads.
+        The submit is deferred until the script has returned, since a script
+        cannot outlive the document it runs in.
+        
+        Args:
+            email: User email
+            password: User password
+            timeout: Maximum time to wait for a navigation or error, in seconds
+            
+        Returns:
+            Dict with "submitted" (False if the form was not found), the
+            resulting "url" and the visible "error" text ("" if none)
+        """
+        started = self.driver.execute_script(
+            "const [emailSel, passwordSel, errorSel, email, password] = arguments;"
+            "const emailInput = document.querySelector(emailSel);"
+            "const form = emailInput && emailInput.form;"
+            "const passwordInput = form && form.querySelector(passwordSel);"
+            "if (!passwordInput) return null;"
+            "const setValue = (el, value) => {"
+            "  Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set.call(el, value);"
+            "  el.dispatchEvent(new Event('input', {bubbles: true}));"
+            "  el.dispatchEvent(new Event('change', {bubbles: true}));"
+            "};"
+            "setValue(emailInput, email);"
+            "setValue(passwordInput, password);"
+            "const error = document.querySelector(errorSel);"
+            # Marks this document, so a reload at the same URL is still noticed
+            "window.__loginSubmitPending = true;"
+            "setTimeout(() => form.requestSubmit ? form.requestSubmit() : form.submit(), 0);"
+            "return [location.href, error ? error.innerText.trim() : ''];",
+            self.EMAIL_INPUT[1],
+            self.PASSWORD_INPUT[1],
+            self.ERROR_MESSAGE[1],
+            email,
+            password
+        )
+        if started is None:
+            logger.error("Login form not found")
+            return {"submitted": False, "url": self.get_current_url(), "error": ""}
+        
+        start_url, error_before = started
+        state = {"url": start_url, "error": ""}
+        
+        def settled(driver):
+            url, same_document, ready_state, error = driver.execute_script(
+                "const el = document.querySelector(arguments[0]);"
+                "return [location.href, window.__loginSubmitPending === true, document.readyState,"
+                "        el && el.getClientRects().length ? el.innerText.trim() : ''];",
+                self.ERROR_MESSAGE[1]
+            )
+            state.update(url=url, error=error)
+            return (url != start_url or
+                    (not same_document and ready_state != "loading") or
+                    (error and error != error_before))
+        
+        try:
+            # The script can fail while the old document unloads; just poll again
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1,
+                          ignored_exceptions=(JavascriptException,)).until(settled)
+        except TimeoutException:
+            logger.warning(f"Login submit showed no navigation or error within {timeout} seconds")
+        self._title = None
+        return {"submitted": True, **state}
+    
+    def is_logged_in(self) -> bool:
+        """Check if a customer is signed in, without waiting
+        
+        Returns:
+            True if the page offers a logout link, False otherwise
+        """
+        return self.is_element_present(self.LOGOUT_LINK)
+    
     def get_error_message(self) -> str:
         """Get error message if present
         
@@ -117,6 +350,21 @@ class LoginPage(BasePage):
         except Exception:
             return ""
     
+    def any_error_visible(self) -> bool:
+        """Check for a visible error or field validation message in one script call
+        
+        Returns:
+            True if any error or validation message is visible, False otherwise
+        """
+        try:
+            return self.driver.execute_script(
+                "return Array.from(document.querySelectorAll(arguments[0]))"
+                "  .some(el => el.getClientRects().length > 0);",
+                f"{self.ERROR_MESSAGE[1]}, {self.VALIDATION_ERROR[1]}"
+            )
+        except Exception:
+            return False
+    
     def get_success_message(self) -> str:
         """Get success message if present
         
@@ -130,6 +378,37 @@ class LoginPage(BasePage):
         except Exception:
             return ""
     
+    def register(self, first_name: str, last_name: str, email: str, password: str, phone: str = None) -> bool:
+        """Fill in and submit the registration form opened from this page
+        
+        Args:
+            first_name: First name
+            last_name: Last name
+            email: Email address
+            password: Password
+            phone: Optional phone number
+            
+        Returns:
+            True if registration was successful, False otherwise
+        """
+        user_data = {"first_name": first_name, "last_name": last_name, "email": email, "password": password}
+        if phone:
+            user_data["phone"] = phone
+        return RegistrationPage(self.driver).register_user(user_data)
+    
+    def forgot_password(self, email: str) -> bool:
+        """Open the password recovery form and request a reset link
+        
+        Args:
+            email: Email address to send the reset link to
+            
+        Returns:
+            True if the request was submitted, False otherwise
+        """
+        if not self.click_forgot_password():
+            return False
+        return ForgotPasswordPage(self.driver).reset_password(email)
+    
     def click_forgot_password(self) -> bool:
         """Click on forgot password link
         
@@ -175,8 +454,8 @@ class LoginPage(BasePage):
     def clear_form(self) -> None:
         """Clear the login form"""
         try:
-            email_field = self.find_element(self.EMAIL_INPUT)
-            password_field = self.find_element(self.PASSWORD_INPUT)
+            email_field = self.find_element_cached(self.EMAIL_INPUT)
+            password_field = self.find_element_cached(self.PASSWORD_INPUT)
             
             email_field.clear()
             password_field.clear()
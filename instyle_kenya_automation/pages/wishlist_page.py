@@ -1,6 +1,7 @@
 """Wishlist page object model"""
 
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException
 from pages.base_page import BasePage
 from config.config import Config
 import logging
@@ -323,12 +324,21 @@ class WishlistPage(BasePage):
             True if all items were added, False otherwise
         """
         try:
-            item_count = self.get_wishlist_item_count()
+            # Count the buttons once; after each click the page reloads, so only
+            # the first button of the fresh DOM is looked up (no explicit wait)
+            item_count = len(self.find_elements(self.ADD_TO_CART_BUTTONS))
             success_count = 0
             
-            for i in range(item_count):
-                if self.add_item_to_cart(0):  # Always use index 0 as items are removed
+            for _ in range(item_count):
+                try:
+                    buttons = self.driver.find_elements(*self.ADD_TO_CART_BUTTONS)
+                    if not buttons:
+                        break
+                    buttons[0].click()  # Always use index 0 as items are removed
+                    self.wait_for_page_load()
                     success_count += 1
+                except StaleElementReferenceException:
+                    continue
             
             return success_count == item_count
             
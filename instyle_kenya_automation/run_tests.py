@@ -2,13 +2,17 @@
 """Test runner script for Instyle Kenya Test Automation"""
 
 import argparse
+import importlib.util
 import sys
 import os
 import subprocess
 from datetime import datetime
 
-def run_pytest_command(command, description):
-    """Run pytest command and handle output"""
+def run_pytest_command(command, description, allow_empty=False):
+    """Run pytest command and handle output
+    
+    allow_empty treats "no tests collected" (exit code 5) as success.
+    """
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"Command: {command}")
@@ -17,7 +21,7 @@ def run_pytest_command(command, description):
     try:
         # Run the command
         result = subprocess.run(command, shell=True)
-        return result.returncode == 0
+        return result.returncode == 0 or (allow_empty and result.returncode == 5)
     except KeyboardInterrupt:
         print("\n❌ Test execution interrupted by user")
         return False
@@ -25,30 +29,73 @@ def run_pytest_command(command, description):
         print(f"❌ Error running tests: {str(e)}")
         return False
 
-def get_test_command(args):
-    """Build pytest command based on arguments"""
+def start_chromedriver_daemon(port=9515):
+    """Start one chromedriver process shared by every pytest run in this invocation
+    
+    Returns:
+        The started selenium Service, or None if it could not be started
+    """
+    try:
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from webdriver_manager.chrome import ChromeDriverManager
+        
+        service = ChromeService(ChromeDriverManager().install(), port=port)
+        service.start()
+    except Exception as e:
+        print(f"⚠️  Could not start shared chromedriver, falling back to per-test drivers: {e}")
+        return None
+    
+    os.environ["INSTYLE_REUSE_BROWSER"] = "1"
+    os.environ["INSTYLE_CHROMEDRIVER_URL"] = service.service_url
+    print(f"♻️  Shared chromedriver running at {service.service_url}")
+    return service
+
+def get_test_command(args, marker=None, serial_pass=False):
+    """Build pytest command based on arguments
+    
+    marker overrides the test selection flags (used by --staged).
+    Parallel runs leave out tests marked serial; serial_pass=True builds
+    the follow-up command that runs only those, on a single process.
+    """
     cmd_parts = ["pytest"]
+    parallel = not serial_pass and (args.parallel or marker == "smoke")
     
     # Add test path/marker
-    if args.smoke:
-        cmd_parts.append("-m smoke")
+    marker_expr = None
+    if marker:
+        marker_expr = marker
+    elif args.smoke:
+        marker_expr = "smoke"
     elif args.regression:
-        cmd_parts.append("-m regression")
+        marker_expr = "regression"
     elif args.login:
-        cmd_parts.append("-m login")
+        marker_expr = "login"
     elif args.cart:
-        cmd_parts.append("-m cart")
+        marker_expr = "cart"
     elif args.search:
-        cmd_parts.append("-m search")
+        marker_expr = "search"
     elif args.wishlist:
-        cmd_parts.append("-m wishlist")
+        marker_expr = "wishlist"
     elif args.navigation:
-        cmd_parts.append("-m navigation")
+        marker_expr = "navigation"
+    elif args.perf:
+        marker_expr = "perf"
     elif args.file:
         cmd_parts.append(f"tests/{args.file}")
     elif args.test:
         cmd_parts.append(args.test)
     
+    # Perf measurements run only when selected with --perf, --file or --test
+    if marker_expr != "perf" and not (args.file or args.test):
+        marker_expr = f"{marker_expr} and not perf" if marker_expr else "not perf"
+    
+    if serial_pass:
+        marker_expr = f"{marker_expr} and serial" if marker_expr else "serial"
+    elif parallel:
+        marker_expr = f"{marker_expr} and not serial" if marker_expr else "not serial"
+    if marker_expr:
+        cmd_parts.append(f'-m "{marker_expr}"')
+    
     # Browser selection
     if args.browser:
         cmd_parts.append(f"--browser {args.browser}")
@@ -57,9 +104,9 @@ def get_test_command(args):
     if args.headless:
         cmd_parts.append("--headless")
     
-    # Parallel execution
-    if args.parallel:
-        cmd_parts.append(f"-n {args.parallel}")
+    # Parallel execution (the staged smoke run always fans out)
+    if parallel:
+        cmd_parts.append(f"-n {args.parallel or 'auto'} --dist=loadgroup")
     
     # Verbosity
     if args.verbose:
@@ -83,34 +130,43 @@ def get_test_command(args):
         cmd_parts.append(f"--tb={args.tb}")
     
     if args.lf:
-        cmd_parts.append("--lf")
+        # Don't fall back to the full (slow) suite when nothing failed last time
+        cmd_parts.append("--lf --last-failed-no-failures=none")
     
     if args.ff:
         cmd_parts.append("--ff")
     
+    if args.lf or args.ff:
+        cmd_parts.append("--no-header")
+    elif os.environ.get("CI", "0").lower() in ("", "0", "false"):
+        # Local dev loop: failures first, stop at the next one, show the slow tests
+        cmd_parts.append("--lf --ff -x --durations=10")
+    
     return " ".join(cmd_parts)
 
 def validate_environment():
     """Validate that the environment is set up correctly"""
     print("🔍 Validating test environment...")
     
+    # One directory listing covers the project-root check and the reports dir
+    with os.scandir(".") as entries:
+        directories = {entry.name for entry in entries if entry.is_dir()}
+    
     # Check if we're in the right directory
-    if not os.path.exists("tests") or not os.path.exists("pages"):
+    if not {"tests", "pages"}.issubset(directories):
         print("❌ Error: Please run this script from the project root directory")
         return False
     
-    # Check if dependencies are installed
-    try:
-        import selenium
-        import pytest
-        print("✅ Core dependencies found")
-    except ImportError as e:
-        print(f"❌ Missing dependencies: {e}")
+    # Check if dependencies are installed (find_spec avoids importing selenium's module tree)
+    missing = [name for name in ("selenium", "pytest") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing dependencies: {', '.join(missing)}")
         print("Please run: pip install -r requirements.txt")
         return False
+    print("✅ Core dependencies found")
     
     # Create reports directory if it doesn't exist
-    if not os.path.exists("reports"):
+    if "reports" not in directories:
         os.makedirs("reports")
         print("📁 Created reports directory")
     
@@ -128,6 +184,8 @@ Examples:
   python run_tests.py --login --browser firefox  # Run login tests with Firefox
   python run_tests.py --cart --html-report       # Run cart tests with HTML report
   python run_tests.py --search --headless        # Run search tests in headless mode
+  python run_tests.py --perf                     # Run performance measurements
+  CI=1 python run_tests.py --staged              # CI: smoke in parallel, then regression
         """
     )
     
@@ -147,10 +205,14 @@ Examples:
                            help="Run wishlist functionality tests")
     test_group.add_argument("--navigation", action="store_true", 
                            help="Run navigation and UI tests")
+    test_group.add_argument("--perf", action="store_true", 
+                           help="Run performance measurements (left out of other runs)")
     test_group.add_argument("--file", type=str, 
                            help="Run specific test file (e.g., test_homepage.py)")
     test_group.add_argument("--test", type=str, 
                            help="Run specific test (full pytest path)")
+    test_group.add_argument("--staged", action="store_true", 
+                           help="Run smoke tests in parallel, then regression tests if smoke passes")
     
     # Browser options
     parser.add_argument("--browser", choices=["chrome", "firefox"], 
@@ -163,6 +225,8 @@ Examples:
                        help="Run tests in parallel with N workers")
     parser.add_argument("--verbose", "-v", action="store_true", 
                        help="Verbose output")
+    parser.add_argument("--reuse-browser", action="store_true", 
+                       help="Start chromedriver once and share it across test runs")
     
     # Reporting options
     parser.add_argument("--html-report", action="store_true", 
@@ -209,10 +273,14 @@ Examples:
         description = "Wishlist functionality tests"
     elif args.navigation:
         description = "Navigation and UI tests"
+    elif args.perf:
+        description = "Performance measurements"
     elif args.file:
         description = f"Tests from {args.file}"
     elif args.test:
         description = f"Specific test: {args.test}"
+    elif args.staged:
+        description = "Staged run (smoke, then regression)"
     
     print(f"🚀 Starting: {description}")
     print(f"🌐 Browser: {args.browser.title()}")
@@ -222,7 +290,27 @@ Examples:
         print(f"⚡ Parallel workers: {args.parallel}")
     
     # Run tests
-    success = run_pytest_command(command, description)
+    chromedriver_service = start_chromedriver_daemon() if args.reuse_browser else None
+    try:
+        if args.staged:
+            success = (run_pytest_command(get_test_command(args, "smoke"), "Smoke stage", allow_empty=args.lf) and
+                       run_pytest_command(get_test_command(args, "smoke", serial_pass=True),
+                                          "Smoke stage (serial tests)", allow_empty=True) and
+                       run_pytest_command(get_test_command(args, "regression"), "Regression stage",
+                                          allow_empty=args.lf))
+            if success and args.parallel:
+                # A parallel regression stage leaves out serial tests, as the smoke stage does
+                success = run_pytest_command(get_test_command(args, "regression", serial_pass=True),
+                                             "Regression stage (serial tests)", allow_empty=True)
+        else:
+            # --lf with no recorded failures deselects everything (exit code 5)
+            success = run_pytest_command(command, description, allow_empty=args.lf)
+            if args.parallel:
+                serial_command = get_test_command(args, serial_pass=True)
+                success = run_pytest_command(serial_command, "Serial tests", allow_empty=True) and success
+    finally:
+        if chromedriver_service:
+            chromedriver_service.stop()
     
     if success:
         print("\n✅ Tests completed successfully!")
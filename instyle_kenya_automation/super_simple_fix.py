@@ -10,152 +10,88 @@ import os
 import sys
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+WEBDRIVER_MANAGER_VERSION = "4.0.2"
+
 def print_status(message, prefix="[INFO]"):
     print(f"{prefix} {message}")
 
+def _raise_walk_error(error):
+    raise error
+
+def _parallel_rmtree(path, max_workers=16):
+    """Delete a directory tree, unlinking its files across a thread pool"""
+    directories = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for root, dirs, files in os.walk(path, topdown=False, onerror=_raise_walk_error):
+            for name in files:
+                executor.submit(os.unlink, os.path.join(root, name))
+            directories.append(root)
+    # The pool has drained, so every directory is now empty; children come first
+    for directory in directories:
+        os.rmdir(directory)
+
+def _safe_rmtree(cache_path):
+    """Remove one cache directory and report the outcome; missing paths are skipped"""
+    try:
+        try:
+            _parallel_rmtree(cache_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Let shutil finish whatever the parallel pass could not remove
+            shutil.rmtree(cache_path)
+        print_status(f"Cleared: {cache_path}", "[SUCCESS]")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print_status(f"Could not clear {cache_path}: {e}", "[WARNING]")
+
 def fix_webdriver_issue():
     """One-click fix for the WebDriver architecture issue"""
     print("=" * 60)
     print("SIMPLE WEBDRIVER FIX")
     print("=" * 60)
     
+    from importlib.metadata import version, PackageNotFoundError
+    
     # Step 1: Upgrade webdriver-manager
     print_status("Step 1: Upgrading webdriver-manager...")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "webdriver-manager==4.0.2"], 
-                      check=True, capture_output=True)
-        print_status("webdriver-manager upgraded successfully!", "[SUCCESS]")
-    except Exception as e:
-        print_status(f"Could not upgrade webdriver-manager: {e}", "[WARNING]")
-    
-    # Step 2: Clear WebDriver cache
-    print_status("Step 2: Clearing corrupted WebDriver cache...")
-    cache_paths = [
-        Path.home() / ".wdm",
-        Path(os.environ.get("LOCALAPPDATA", "")) / ".wdm",
-    ]
-    
-    for cache_path in cache_paths:
-        if cache_path.exists():
-            try:
-                shutil.rmtree(cache_path)
-                print_status(f"Cleared: {cache_path}", "[SUCCESS]")
-            except Exception as e:
-                print_status(f"Could not clear {cache_path}: {e}", "[WARNING]")
-    
-    # Step 3: Create fixed driver factory
-    print_status("Step 3: Creating fixed driver factory...")
-    
-    fixed_driver_code = '''"""Fixed Driver Factory for Windows architecture issues"""
-
-import os
-import platform
-import shutil
-from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from webdriver_manager.chrome import ChromeDriverManager
-from config.config import Config
-import logging
-
-logger = logging.getLogger(__name__)
-
-class DriverFactory:
-    """Simple, fixed factory for creating WebDriver instances"""
+        installed_version = version("webdriver-manager")
+    except PackageNotFoundError:
+        installed_version = None
     
-    @staticmethod
-    def create_driver(browser_name: str = None) -> webdriver.Remote:
-        """Create a WebDriver instance with Windows fix"""
-        if browser_name is None:
-            browser_name = Config.DEFAULT_BROWSER
-            
-        browser_name = browser_name.lower()
-        
-        try:
-            if browser_name == "chrome":
-                return DriverFactory._create_chrome_driver()
-            else:
-                raise ValueError(f"Unsupported browser: {browser_name}")
-        except Exception as e:
-            logger.error(f"Failed to create {browser_name} driver: {str(e)}")
-            raise
-    
-    @staticmethod
-    def _create_chrome_driver() -> webdriver.Chrome:
-        """Create Chrome WebDriver with Windows architecture fix"""
-        options = ChromeOptions()
-        
-        # Essential options
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        # Get browser options from config
+    if installed_version == WEBDRIVER_MANAGER_VERSION:
+        print_status(f"webdriver-manager {installed_version} already current", "[SKIP]")
+    else:
         try:
-            browser_options = Config.get_browser_options("chrome")
-            for arg in browser_options.get("arguments", []):
-                options.add_argument(arg)
-        except:
-            pass
-        
-        # Fixed service creation for Windows
-        try:
-            # Clear cache first to force correct architecture download
-            if platform.system() == "Windows":
-                cache_path = Path.home() / ".wdm" / "drivers" / "chromedriver"
-                if cache_path.exists():
-                    shutil.rmtree(cache_path)
-            
-            # Create service with fresh download
-            service = ChromeService(ChromeDriverManager().install())
-            
+            subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade",
+                           "--disable-pip-version-check", "--no-input", "-q",
+                           f"webdriver-manager=={WEBDRIVER_MANAGER_VERSION}"],
+                          check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            print_status("webdriver-manager upgraded successfully!", "[SUCCESS]")
+        except subprocess.CalledProcessError as e:
+            print_status(f"Could not upgrade webdriver-manager: {e.stderr.strip() or e}", "[WARNING]")
         except Exception as e:
-            logger.warning(f"ChromeDriverManager failed: {e}, trying fallback")
-            # Fallback to system PATH
-            service = ChromeService()
-        
-        # Create and configure driver
-        driver = webdriver.Chrome(service=service, options=options)
-        
-        # Anti-detection
-        try:
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        except:
-            pass
-        
-        return driver
+            print_status(f"Could not upgrade webdriver-manager: {e}", "[WARNING]")
     
-    @staticmethod  
-    def configure_driver(driver: webdriver.Remote) -> None:
-        """Configure the WebDriver with common settings"""
-        try:
-            driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            driver.set_page_load_timeout(Config.PAGE_LOAD_TIMEOUT)
-            
-            if hasattr(Config, 'WINDOW_WIDTH') and hasattr(Config, 'WINDOW_HEIGHT') and Config.WINDOW_WIDTH and Config.WINDOW_HEIGHT:
-                driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
-            else:
-                driver.maximize_window()
-        except Exception as e:
-            logger.warning(f"Driver configuration warning: {e}")
-'''
+    # Step 2: Clear WebDriver cache
+    print_status("Step 2: Clearing corrupted WebDriver cache...")
+    cache_paths = [Path.home() / ".wdm"]
+    local_app_data = os.environ.get("LOCALAPPDATA")
+    if local_app_data:
+        cache_paths.append(Path(local_app_data) / ".wdm")
     
-    # Write the fixed code
-    try:
-        with open("utils/driver_factory.py", "w", encoding="utf-8") as f:
-            f.write(fixed_driver_code)
-        print_status("Fixed driver factory created!", "[SUCCESS]")
-    except Exception as e:
-        print_status(f"Could not create fixed driver factory: {e}", "[ERROR]")
-        return False
+    with ThreadPoolExecutor(max_workers=len(cache_paths)) as executor:
+        list(executor.map(_safe_rmtree, cache_paths))
     
-    # Step 4: Test the fix
-    print_status("Step 4: Testing the fix...")
+    # utils/driver_factory.py already pins chromedriver and retries after WinError 193;
+    # with the cache cleared above, the next run downloads a matching driver
+    # Step 3: Test the fix
+    print_status("Step 3: Testing the fix...")
     try:
         # Quick test
         from utils.driver_factory import DriverFactory
@@ -1,9 +1,103 @@
+import importlib
+import os
+import types
 import pytest
+from selenium.webdriver.common.timeouts import Timeouts
+from config.config import Config
 from utils.driver_factory import DriverFactory
+from pages.home_page import HomePage
+from pages.login_page import LoginPage
+from pages.forgot_password_page import ForgotPasswordPage
 
-@pytest.fixture
-def driver():
-    """Create and return WebDriver instance."""
-    driver_instance = DriverFactory.create_driver()
+def pytest_addoption(parser):
+    """Add the --headless option (on by default in CI, e.g. CI=1 or CI=true)."""
+    # Same CI check as run_tests.py
+    in_ci = os.environ.get("CI", "0").lower() not in ("", "0", "false")
+    parser.addoption("--headless", action="store_true", default=in_ci,
+                     help="run the regular browser headless as well; it still loads images")
+
+def pytest_configure(config):
+    """Import the page objects (and Selenium with them) once, before collection."""
+    # Imported only for the side effect of warming the module cache in each xdist worker
+    for module in ("pages.cart_page", "pages.product_page", "pages.search_results_page"):
+        importlib.import_module(module)
+
+@pytest.fixture(scope="session")
+def session_driver(request):
+    """Create one WebDriver instance shared by the whole test session."""
+    headless = request.config.getoption("headless")
+    driver_instance = DriverFactory.create_driver(headless=headless, lean=False)
+    DriverFactory.configure_driver(driver_instance, headless=headless)
+    yield driver_instance
+    driver_instance.quit()
+
+@pytest.fixture(scope="session")
+def headless_session_driver():
+    """Create a lean headless WebDriver, started only if a test asks for it."""
+    driver_instance = DriverFactory.create_driver(headless=True)
+    DriverFactory.configure_driver(driver_instance, headless=True)
     yield driver_instance
     driver_instance.quit()
+
+@pytest.fixture
+def driver(request):
+    """Return a shared WebDriver reset to a clean state for each test."""
+    # Tests that never inspect rendered output get the lean headless browser
+    lean = request.node.get_closest_marker("error_handling") or request.node.get_closest_marker("headless")
+    if lean and not request.node.get_closest_marker("needs_images"):
+        shared_driver = request.getfixturevalue("headless_session_driver")
+        headless = True
+    else:
+        shared_driver = request.getfixturevalue("session_driver")
+        headless = request.config.getoption("headless")
+    
+    # Cookies and storage are cleared before leaving the page, since both are
+    # scoped to the current site; CDP clears cookies for the rest where available
+    shared_driver.delete_all_cookies()
+    shared_driver.execute_script(
+        "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+    )
+    if hasattr(shared_driver, "execute_cdp_cmd"):
+        shared_driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        shared_driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+    shared_driver.get("about:blank")
+
+    # Undo window resizes and timeout changes left behind by the previous test
+    shared_driver.timeouts = Timeouts(implicit_wait=0, page_load=Config.PAGE_LOAD_TIMEOUT)
+    shared_driver.set_window_size(*DriverFactory.window_size(headless))
+    yield shared_driver
+
+@pytest.fixture(scope="session")
+def test_user_data():
+    """Shared test account details (read-only; copy() to change a field)."""
+    return types.MappingProxyType(Config.TEST_USER)
+
+@pytest.fixture(scope="session")
+def invalid_user_data():
+    """Invalid credentials for negative login/registration tests (read-only)."""
+    return types.MappingProxyType(Config.INVALID_USER)
+
+@pytest.fixture(scope="session")
+def search_terms():
+    """Search terms from Config (read-only)."""
+    return tuple(Config.SEARCH_TERMS)
+
+@pytest.fixture(scope="session")
+def product_categories():
+    """Product category names from Config (read-only)."""
+    return tuple(Config.CATEGORIES)
+
+@pytest.fixture
+def home_page(driver):
+    """Home page object bound to the test's driver (not yet loaded)."""
+    return HomePage(driver)
+
+@pytest.fixture
+def login_page(driver):
+    """Login page object bound to the test's driver (not yet loaded)."""
+    return LoginPage(driver)
+
+@pytest.fixture
+def forgot_page(driver):
+    """Forgot password page object bound to the test's driver (not yet loaded)."""
+    return ForgotPasswordPage(driver)
@@ -10,14 +10,72 @@ from config.config import Config
 
 logger = logging.getLogger(__name__)
 
+def _snapshot_cart(cart_page):
+    """Read the cart state shared through the cart_state fixture"""
+    # get_cart_item_count() waits for rows to appear, so skip it for an empty cart
+    is_empty = cart_page.is_cart_empty()
+    return {"is_empty": is_empty, "item_count": 0 if is_empty else cart_page.get_cart_item_count()}
+
+@pytest.fixture(scope="session")
+def session_cart_page(session_driver):
+    """Cart page object created and loaded once per session"""
+    cart_page = CartPage(session_driver)
+    cart_page.load()
+    return cart_page
+
+@pytest.fixture
+def loaded_cart_page(session_cart_page):
+    """Session cart page, reloaded only if an earlier test navigated away"""
+    if "cart" not in session_cart_page.get_current_url().lower():
+        session_cart_page.load()
+    return session_cart_page
+
+@pytest.fixture
+def cart_state(request, session_cart_page):
+    """Cart emptiness/item count, probed at the start of each test
+    
+    The driver fixture clears cookies (and with them the cart) on the shared
+    browser, so a snapshot from an earlier test can't be trusted.
+    """
+    if "driver" in request.fixturenames:
+        # Let the driver reset run first so the probe sees the cart the test will
+        request.getfixturevalue("driver")
+    if "cart" not in session_cart_page.get_current_url().lower():
+        session_cart_page.load()
+    return _snapshot_cart(session_cart_page)
+
+@pytest.fixture(scope="class")
+def cart_features(session_cart_page):
+    """Which optional cart widgets are on the page, probed once per class"""
+    if "cart" not in session_cart_page.get_current_url().lower():
+        session_cart_page.load()
+    return session_cart_page.probe_features()
+
+@pytest.fixture(scope="class")
+def cart_page_factory(session_driver):
+    """Build fresh CartPage objects on the class's shared driver"""
+    return lambda: CartPage(session_driver)
+
+@pytest.fixture
+def require_nonempty_cart(cart_state):
+    """Skip the test before it starts when the cart has no items"""
+    if cart_state["is_empty"]:
+        pytest.skip("cart is empty")
+
+@pytest.fixture
+def require_empty_cart(cart_state):
+    """Skip the test before it starts when the cart has items"""
+    if not cart_state["is_empty"]:
+        pytest.skip("cart is not empty")
+
 class TestCart:
     """Test suite for shopping cart functionality"""
     
     @pytest.mark.cart
     @pytest.mark.smoke
-    def test_cart_page_loads(self, driver):
+    def test_cart_page_loads(self, driver, cart_page_factory):
         """Test that cart page loads successfully"""
-        cart_page = CartPage(driver)
+        cart_page = cart_page_factory()
         cart_page.load()
         
         assert cart_page.is_loaded(), "Cart page should load successfully"
@@ -25,20 +83,16 @@ class TestCart:
     
     @pytest.mark.cart
     @pytest.mark.smoke
-    def test_empty_cart_display(self, driver):
+    def test_empty_cart_display(self, loaded_cart_page, require_empty_cart):
         """Test empty cart display"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if cart_page.is_cart_empty():
-            empty_message = cart_page.get_empty_cart_message()
-            assert empty_message, "Empty cart should display a message"
-            logger.info(f"Empty cart displays message: '{empty_message}'")
-        else:
-            logger.info("Cart is not empty, skipping empty cart test")
+        empty_message = cart_page.get_empty_cart_message()
+        assert empty_message, "Empty cart should display a message"
+        logger.info(f"Empty cart displays message: '{empty_message}'")
     
     @pytest.mark.cart
-    def test_cart_access_from_homepage(self, driver):
+    def test_cart_access_from_homepage(self, driver, cart_page_factory):
         """Test accessing cart from homepage"""
         home_page = HomePage(driver)
         home_page.load()
@@ -46,12 +100,12 @@ class TestCart:
         success = home_page.click_cart_link()
         assert success, "Should be able to access cart from homepage"
         
-        cart_page = CartPage(driver)
+        cart_page = cart_page_factory()
         assert cart_page.is_loaded(), "Should navigate to cart page"
         logger.info("Successfully accessed cart from homepage")
     
     @pytest.mark.cart
-    def test_add_product_to_cart(self, driver, search_terms):
+    def test_add_product_to_cart(self, driver, search_terms, cart_state, cart_page_factory):
         """Test adding a product to cart"""
         # Search for a product first
         home_page = HomePage(driver)
@@ -77,11 +131,12 @@ class TestCart:
                             logger.info("Successfully added product to cart")
                             
                             # Verify cart has items
-                            cart_page = CartPage(driver)
+                            cart_page = cart_page_factory()
                             cart_page.load()
+                            cart_state.update(_snapshot_cart(cart_page))
                             
-                            if not cart_page.is_cart_empty():
-                                cart_items = cart_page.get_cart_items()
+                            if not cart_state["is_empty"]:
+                                cart_items = cart_page.get_cart_items_fast()
                                 assert len(cart_items) > 0, "Cart should contain items after adding product"
                                 logger.info(f"Cart now contains {len(cart_items)} items")
                         else:
@@ -96,138 +151,122 @@ class TestCart:
             logger.warning(f"No search results found for '{search_term}'")
     
     @pytest.mark.cart
-    def test_cart_item_display(self, driver):
+    def test_cart_item_display(self, loaded_cart_page, require_nonempty_cart):
         """Test cart item information display"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if not cart_page.is_cart_empty():
-            cart_items = cart_page.get_cart_items()
+        cart_items = cart_page.get_cart_items_fast()
+        
+        if len(cart_items) > 0:
+            first_item = cart_items[0]
             
-            if len(cart_items) > 0:
-                first_item = cart_items[0]
-                
-                # Verify item has required information
-                assert first_item["name"], "Cart item should have a name"
-                assert first_item["price"], "Cart item should have a price"
-                assert first_item["quantity"], "Cart item should have a quantity"
-                
-                logger.info(f"Cart item display test passed. First item: {first_item['name']}")
-            else:
-                logger.info("No items in cart to test display")
+            # Verify item has required information
+            assert first_item["name"], "Cart item should have a name"
+            assert first_item["price"], "Cart item should have a price"
+            assert first_item["quantity"], "Cart item should have a quantity"
+            
+            logger.info(f"Cart item display test passed. First item: {first_item['name']}")
         else:
-            logger.info("Cart is empty, skipping item display test")
+            logger.info("No items in cart to test display")
     
     @pytest.mark.cart
-    def test_quantity_update(self, driver):
+    @pytest.mark.xdist_group("cart_mutations")
+    def test_quantity_update(self, driver, cart_page_factory, require_nonempty_cart):
         """Test updating item quantity in cart"""
-        cart_page = CartPage(driver)
+        cart_page = cart_page_factory()
         cart_page.load()
         
-        if not cart_page.is_cart_empty():
-            initial_count = cart_page.get_cart_item_count()
+        initial_count = cart_page.get_cart_item_count()
+        
+        if initial_count > 0:
+            # Try to increase quantity of first item
+            success = cart_page.increase_item_quantity(0)
             
-            if initial_count > 0:
-                # Try to increase quantity of first item
-                success = cart_page.increase_item_quantity(0)
+            if success:
+                logger.info("Successfully increased item quantity")
                 
-                if success:
-                    logger.info("Successfully increased item quantity")
-                    
-                    # Try to decrease quantity
-                    decrease_success = cart_page.decrease_item_quantity(0)
-                    if decrease_success:
-                        logger.info("Successfully decreased item quantity")
-                else:
-                    # Try manual quantity update
-                    update_success = cart_page.update_item_quantity(0, 2)
-                    if update_success:
-                        logger.info("Successfully updated item quantity manually")
-                    else:
-                        logger.warning("Could not update item quantity")
+                # Try to decrease quantity
+                decrease_success = cart_page.decrease_item_quantity(0)
+                if decrease_success:
+                    logger.info("Successfully decreased item quantity")
             else:
-                logger.info("No items in cart to test quantity update")
+                # Try manual quantity update
+                update_success = cart_page.update_item_quantity(0, 2)
+                if update_success:
+                    logger.info("Successfully updated item quantity manually")
+                else:
+                    logger.warning("Could not update item quantity")
         else:
-            logger.info("Cart is empty, skipping quantity update test")
+            logger.info("No items in cart to test quantity update")
     
     @pytest.mark.cart
-    def test_item_removal(self, driver):
+    @pytest.mark.xdist_group("cart_mutations")
+    def test_item_removal(self, driver, cart_state, cart_page_factory, require_nonempty_cart):
         """Test removing items from cart"""
-        cart_page = CartPage(driver)
+        cart_page = cart_page_factory()
         cart_page.load()
         
-        if not cart_page.is_cart_empty():
-            initial_count = cart_page.get_cart_item_count()
+        initial_count = cart_page.get_cart_item_count()
+        
+        if initial_count > 0:
+            # Try to remove first item
+            success = cart_page.remove_item(0)
             
-            if initial_count > 0:
-                # Try to remove first item
-                success = cart_page.remove_item(0)
-                
-                if success:
-                    final_count = cart_page.get_cart_item_count()
-                    assert final_count < initial_count, "Item count should decrease after removal"
-                    logger.info(f"Successfully removed item. Count: {initial_count} -> {final_count}")
-                else:
-                    logger.warning("Could not remove item from cart")
+            if success:
+                cart_state.update(_snapshot_cart(cart_page))
+                final_count = cart_state["item_count"]
+                assert final_count < initial_count, "Item count should decrease after removal"
+                logger.info(f"Successfully removed item. Count: {initial_count} -> {final_count}")
             else:
-                logger.info("No items in cart to test removal")
+                logger.warning("Could not remove item from cart")
         else:
-            logger.info("Cart is empty, skipping item removal test")
+            logger.info("No items in cart to test removal")
     
     @pytest.mark.cart
-    def test_cart_totals_display(self, driver):
+    def test_cart_totals_display(self, loaded_cart_page, require_nonempty_cart):
         """Test cart totals and pricing display"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if not cart_page.is_cart_empty():
-            subtotal = cart_page.get_subtotal()
-            total = cart_page.get_total_amount()
-            
-            assert subtotal or total, "Cart should display pricing information"
-            
-            if subtotal:
-                logger.info(f"Cart subtotal: {subtotal}")
-            if total:
-                logger.info(f"Cart total: {total}")
-            
-            # Check shipping cost if displayed
-            shipping = cart_page.get_shipping_cost()
-            if shipping:
-                logger.info(f"Shipping cost: {shipping}")
-        else:
-            logger.info("Cart is empty, skipping totals display test")
+        subtotal = cart_page.get_subtotal()
+        total = cart_page.get_total_amount()
+        
+        assert subtotal or total, "Cart should display pricing information"
+        
+        if subtotal:
+            logger.info(f"Cart subtotal: {subtotal}")
+        if total:
+            logger.info(f"Cart total: {total}")
+        
+        # Check shipping cost if displayed
+        shipping = cart_page.get_shipping_cost()
+        if shipping:
+            logger.info(f"Shipping cost: {shipping}")
     
     @pytest.mark.cart
-    def test_checkout_button(self, driver):
+    def test_checkout_button(self, loaded_cart_page, cart_features, require_nonempty_cart):
         """Test checkout button functionality"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if not cart_page.is_cart_empty():
-            if cart_page.is_element_present(cart_page.CHECKOUT_BUTTON):
-                # Note: We don't actually proceed to checkout to avoid creating orders
-                # Just verify the button is present and clickable
-                checkout_button = cart_page.find_element(cart_page.CHECKOUT_BUTTON)
-                assert checkout_button.is_enabled(), "Checkout button should be enabled when cart has items"
-                logger.info("Checkout button is present and enabled")
-            else:
-                logger.warning("Checkout button not found")
+        if cart_features["checkout_button"]:
+            # Note: We don't actually proceed to checkout to avoid creating orders
+            # Just verify the button is present and clickable
+            checkout_button = cart_page.find_element(cart_page.CHECKOUT_BUTTON)
+            assert checkout_button.is_enabled(), "Checkout button should be enabled when cart has items"
+            logger.info("Checkout button is present and enabled")
         else:
-            logger.info("Cart is empty, skipping checkout button test")
+            logger.warning("Checkout button not found")
     
     @pytest.mark.cart
-    def test_continue_shopping_link(self, driver):
+    def test_continue_shopping_link(self, loaded_cart_page):
         """Test continue shopping functionality"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
         if cart_page.is_element_present(cart_page.CONTINUE_SHOPPING_LINK):
             success = cart_page.continue_shopping()
             
             if success:
                 # Should be redirected away from cart page
-                assert "cart" not in driver.current_url.lower(), "Should be redirected away from cart"
+                assert "cart" not in cart_page.get_current_url().lower(), "Should be redirected away from cart"
                 logger.info("Continue shopping link works correctly")
             else:
                 logger.warning("Could not click continue shopping link")
@@ -236,12 +275,11 @@ class TestCart:
     
     @pytest.mark.cart
     @pytest.mark.regression
-    def test_coupon_application(self, driver):
+    def test_coupon_application(self, loaded_cart_page, cart_features, require_nonempty_cart):
         """Test coupon/discount code application"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if cart_page.is_element_present(cart_page.COUPON_INPUT) and not cart_page.is_cart_empty():
+        if cart_features["coupon_input"]:
             # Try applying an invalid coupon code
             test_coupon = "TESTCODE123"
             success = cart_page.apply_coupon(test_coupon)
@@ -253,17 +291,14 @@ class TestCart:
             else:
                 logger.warning("Could not apply coupon code")
         else:
-            logger.info("Coupon input not found or cart is empty")
+            logger.info("Coupon input not found")
     
     @pytest.mark.cart
-    def test_shipping_calculator(self, driver):
+    def test_shipping_calculator(self, loaded_cart_page, cart_features, require_nonempty_cart):
         """Test shipping cost calculator"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if (cart_page.is_element_present(cart_page.SHIPPING_CALCULATOR) and 
-            not cart_page.is_cart_empty()):
-            
+        if cart_features["shipping_calculator"]:
             # Try calculating shipping
             success = cart_page.calculate_shipping(
                 country="Kenya",
@@ -276,17 +311,14 @@ class TestCart:
             else:
                 logger.warning("Could not calculate shipping")
         else:
-            logger.info("Shipping calculator not found or cart is empty")
+            logger.info("Shipping calculator not found")
     
     @pytest.mark.cart
-    def test_order_notes(self, driver):
+    def test_order_notes(self, loaded_cart_page, cart_features, require_nonempty_cart):
         """Test order notes functionality"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if (cart_page.is_element_present(cart_page.ORDER_NOTES) and 
-            not cart_page.is_cart_empty()):
-            
+        if cart_features["order_notes"]:
             test_notes = "This is a test order note."
             success = cart_page.add_order_notes(test_notes)
             
@@ -298,49 +330,44 @@ class TestCart:
             else:
                 logger.warning("Could not add order notes")
         else:
-            logger.info("Order notes field not found or cart is empty")
+            logger.info("Order notes field not found")
     
     @pytest.mark.cart
     @pytest.mark.regression
-    def test_cart_persistence(self, driver):
+    def test_cart_persistence(self, loaded_cart_page, require_nonempty_cart):
         """Test cart persistence across page navigation"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if not cart_page.is_cart_empty():
-            initial_count = cart_page.get_cart_item_count()
-            initial_items = cart_page.get_cart_items()
-            
-            # Navigate away from cart and back
-            home_page = HomePage(driver)
-            home_page.load()
-            
-            # Go back to cart
+        initial_count = cart_page.get_cart_item_count()
+        initial_items = cart_page.get_cart_items_fast()
+        cart_url = cart_page.get_current_url()
+        
+        # Navigate away from cart and back
+        home_page = HomePage(cart_page.driver)
+        home_page.load()
+        
+        # Go back to cart through history, which waits for the page to load; reload it only if that fails
+        if not home_page.history_back_to(cart_url, timeout=5):
+            logger.info("Back navigation did not return to the cart, reloading it")
             cart_page.load()
-            
-            final_count = cart_page.get_cart_item_count()
-            assert final_count == initial_count, "Cart should persist across navigation"
-            
-            logger.info(f"Cart persistence test passed. Items maintained: {final_count}")
-        else:
-            logger.info("Cart is empty, skipping persistence test")
+        
+        final_count = cart_page.get_cart_item_count()
+        assert final_count == initial_count, "Cart should persist across navigation"
+        
+        logger.info(f"Cart persistence test passed. Items maintained: {final_count}")
     
     @pytest.mark.cart
-    def test_cart_validation_empty_state(self, driver):
+    def test_cart_validation_empty_state(self, loaded_cart_page, require_empty_cart):
         """Test cart validation in empty state"""
-        cart_page = CartPage(driver)
-        cart_page.load()
+        cart_page = loaded_cart_page
         
-        if cart_page.is_cart_empty():
-            # Checkout button should be disabled or not present
-            if cart_page.is_element_present(cart_page.CHECKOUT_BUTTON):
-                checkout_button = cart_page.find_element(cart_page.CHECKOUT_BUTTON)
-                # Button might be disabled or hidden
-                is_enabled = checkout_button.is_enabled()
-                is_displayed = checkout_button.is_displayed()
-                
-                logger.info(f"Empty cart validation - Checkout button enabled: {is_enabled}, displayed: {is_displayed}")
-            else:
-                logger.info("Checkout button not present in empty cart (correct behavior)")
+        # Checkout button should be disabled or not present
+        if cart_page.is_element_present(cart_page.CHECKOUT_BUTTON):
+            checkout_button = cart_page.find_element(cart_page.CHECKOUT_BUTTON)
+            # Button might be disabled or hidden
+            is_enabled = checkout_button.is_enabled()
+            is_displayed = checkout_button.is_displayed()
+            
+            logger.info(f"Empty cart validation - Checkout button enabled: {is_enabled}, displayed: {is_displayed}")
         else:
-            logger.info("Cart is not empty, skipping empty state validation")
+            logger.info("Checkout button not present in empty cart (correct behavior)")
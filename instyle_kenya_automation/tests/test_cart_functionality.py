@@ -1,37 +1,106 @@
 import pytest
-import time
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from pages.cart_page import CartPage
 from pages.shop_page import ShopPage
 from pages.home_page import HomePage
 from config.config import Config
 
+# Keep every test in this module on one xdist worker (--dist=loadgroup) so they see one cart
+pytestmark = pytest.mark.xdist_group("cart_functionality")
+
+_CART_STATE_SCRIPT = """
+    const [itemSel, emptySel, nameSel, priceSel] = arguments;
+    const text = sel => [...document.querySelectorAll(sel)].map(el => el.innerText.trim());
+    const message = document.querySelector(emptySel);
+    const count = document.querySelectorAll(itemSel).length;
+    return {
+        empty: (message !== null && message.offsetParent !== null) || count === 0,
+        count: count,
+        item_names: text(nameSel),
+        prices: text(priceSel)
+    };
+"""
+
+# WooCommerce mirrors the cart in web storage (wc_cart_hash etc.); the
+# fragments cache holds rendered HTML, so it is left out of the comparison
+_CART_STORAGE_SCRIPT = """
+    const pick = store => Object.keys(store).sort()
+        .filter(key => /cart/i.test(key) && !/fragments/i.test(key))
+        .map(key => [key, store.getItem(key)]);
+    return JSON.stringify({ls: pick(localStorage), ss: pick(sessionStorage)});
+"""
+
+@pytest.fixture(scope="class")
+def cart_page(session_driver):
+    """Cart page opened once and shared by every test in the class"""
+    page = CartPage(session_driver)
+    page.load()
+    return page
+
+def _return_to_cart(cart_page):
+    """Reopen the cart only if an earlier test navigated away from it"""
+    if "cart" not in cart_page.get_current_url().lower():
+        cart_page.load()
+    return cart_page
+
+@pytest.fixture
+def cart_state(cart_page):
+    """Snapshot the shared cart page's state with a single script call"""
+    _return_to_cart(cart_page)
+    return cart_page.driver.execute_script(
+        _CART_STATE_SCRIPT,
+        CartPage.CART_ITEMS[1],
+        CartPage.EMPTY_CART_MESSAGE[1],
+        CartPage.PRODUCT_NAMES[1],
+        CartPage.PRODUCT_PRICES[1],
+    )
+
+def _cart_badge_text(driver):
+    """Text of the header cart-count badge, or '' when the theme has none"""
+    badges = driver.find_elements(*HomePage.CART_COUNT)
+    return badges[0].text if badges else ""
+
+def _wait_for_cart_badge_change(driver, initial_badge, timeout=3):
+    """Wait briefly for the cart-count badge to change; returns at once if the theme has none"""
+    if not driver.find_elements(*HomePage.CART_COUNT):
+        return False
+    try:
+        # The badge is re-rendered after add-to-cart, so a read can hit a stale element
+        WebDriverWait(driver, timeout, poll_frequency=0.2,
+                      ignored_exceptions=[StaleElementReferenceException]).until(
+            lambda d: _cart_badge_text(d) != initial_badge
+        )
+        return True
+    except TimeoutException:
+        return False
+
 @pytest.mark.product
 class TestCartFunctionality:
-    """Test cases for shopping cart functionality"""
+    """Test cases for shopping cart functionality
+    
+    Tests share one class-scoped cart page; the ones that navigate away
+    or change the cart's contents are defined (and so run) last.
+    """
     
-    def test_cart_page_loads(self, driver):
+    def test_cart_page_loads(self, cart_page):
         """Test that cart page loads successfully"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        assert cart_page.is_cart_page_loaded(), "Cart page did not load successfully"
-        
-    def test_empty_cart_display(self, driver):
+        assert cart_page.wait_for_full_load(), "Cart page did not finish loading"
+        assert cart_page.is_loaded(), "Cart page did not load successfully"
+            
+    def test_empty_cart_display(self, cart_page, cart_state):
         """Test empty cart message display"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
         # Check if cart is empty or has items
-        if cart_page.is_cart_empty():
+        if cart_state["empty"]:
             assert cart_page.is_element_visible(cart_page.EMPTY_CART_MESSAGE), "Empty cart message should be displayed"
         else:
-            items_count = cart_page.get_cart_items_count()
-            assert items_count > 0, "Cart shows items but count is 0"
+            assert cart_state["count"] > 0, "Cart shows items but count is 0"
             
-    def test_add_product_to_cart_from_shop(self, driver):
+    def test_add_product_to_cart_from_shop(self, cart_page):
         """Test adding product to cart from shop page"""
+        driver = cart_page.driver
         shop_page = ShopPage(driver)
-        cart_page = CartPage(driver)
         
         # Go to shop page
         shop_page.open_shop_page()
@@ -49,15 +118,16 @@ class TestCartFunctionality:
             pytest.skip("No product names found")
             
         try:
-            # Add first product to cart
+            # Add first product to cart and wait for the header badge to update
+            initial_badge = _cart_badge_text(driver)
             shop_page.add_first_product_to_cart()
-            time.sleep(2)  # Wait for cart update
+            _wait_for_cart_badge_change(driver, initial_badge)
             
             # Go to cart page to verify
-            cart_page.open_cart_page()
+            cart_page.load()
             
             if not cart_page.is_cart_empty():
-                cart_items = cart_page.get_cart_item_names()
+                cart_items = [item["name"] for item in cart_page.get_cart_snapshot_js()]
                 assert len(cart_items) > 0, "Product was not added to cart"
             else:
                 pytest.skip("Cart appears empty - add to cart may not be functional")
@@ -65,17 +135,14 @@ class TestCartFunctionality:
         except Exception as e:
             pytest.skip(f"Could not add product to cart: {e}")
             
-    def test_cart_item_details_display(self, driver):
+    def test_cart_item_details_display(self, cart_state):
         """Test cart item details are displayed correctly"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_cart_empty():
+        if cart_state["empty"]:
             pytest.skip("Cart is empty - cannot test item details")
             
         # Check item details
-        item_names = cart_page.get_cart_item_names()
-        item_prices = cart_page.get_cart_item_prices()
+        item_names = cart_state["item_names"]
+        item_prices = cart_state["prices"]
         
         assert len(item_names) > 0, "No item names displayed"
         assert len(item_prices) > 0, "No item prices displayed"
@@ -84,73 +151,9 @@ class TestCartFunctionality:
         for price in item_prices:
             assert "Ksh" in price, f"Price '{price}' does not contain currency"
             
-    def test_quantity_update_functionality(self, driver):
-        """Test updating item quantity in cart"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_cart_empty():
-            pytest.skip("Cart is empty - cannot test quantity update")
-            
-        items_count = cart_page.get_cart_items_count()
-        if items_count == 0:
-            pytest.skip("No items in cart to update quantity")
-            
-        try:
-            # Get initial quantity for first item
-            initial_qty = cart_page.get_item_quantity(0)
-            
-            # Try to increase quantity
-            cart_page.increase_quantity(0)
-            time.sleep(2)
-            
-            # Check if quantity increased
-            new_qty = cart_page.get_item_quantity(0)
-            
-            if new_qty > initial_qty:
-                assert True, "Quantity increased successfully"
-            else:
-                # Try updating quantity directly
-                cart_page.update_quantity(0, 3)
-                time.sleep(2)
-                
-                updated_qty = cart_page.get_item_quantity(0)
-                assert updated_qty != initial_qty or updated_qty == 3, "Quantity update functionality working"
-                
-        except Exception as e:
-            pytest.skip(f"Quantity update not available: {e}")
-            
-    def test_remove_item_from_cart(self, driver):
-        """Test removing item from cart"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_cart_empty():
-            pytest.skip("Cart is empty - cannot test item removal")
-            
-        initial_count = cart_page.get_cart_items_count()
-        if initial_count == 0:
-            pytest.skip("No items to remove")
-            
-        try:
-            # Remove first item
-            cart_page.remove_item(0)
-            time.sleep(2)
-            
-            # Check if item was removed
-            final_count = cart_page.get_cart_items_count()
-            
-            assert final_count < initial_count or cart_page.is_cart_empty(), "Item was not removed from cart"
-            
-        except Exception as e:
-            pytest.skip(f"Remove item functionality not available: {e}")
-            
-    def test_cart_totals_display(self, driver):
+    def test_cart_totals_display(self, cart_page, cart_state):
         """Test cart totals calculation and display"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_cart_empty():
+        if cart_state["empty"]:
             pytest.skip("Cart is empty - cannot test totals")
             
         # Check for subtotal
@@ -163,40 +166,79 @@ class TestCartFunctionality:
         if total:
             assert "Ksh" in total, "Total amount should contain currency"
             
-    def test_coupon_application(self, driver):
+    def test_coupon_application(self, cart_page, cart_state):
         """Test coupon code application"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_cart_empty():
+        if cart_state["empty"]:
             pytest.skip("Cart is empty - cannot test coupon")
             
         try:
             # Try applying a test coupon
             cart_page.apply_coupon("TEST10")
-            time.sleep(2)
             
-            # Check for success or error message
-            success_msg = cart_page.get_success_message()
-            error_msg = cart_page.get_error_message()
+            # Wait for a success or error message
+            responded = cart_page.wait_until(EC.any_of(
+                EC.visibility_of_element_located(cart_page.COUPON_SUCCESS),
+                EC.visibility_of_element_located(cart_page.COUPON_ERROR)))
             
-            assert success_msg or error_msg, "Expected response for coupon application"
+            assert responded, "Expected response for coupon application"
             
         except Exception as e:
             pytest.skip(f"Coupon functionality not available: {e}")
             
-    def test_proceed_to_checkout(self, driver):
-        """Test proceeding to checkout"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
+    def test_cart_persistence_across_sessions(self, cart_page, cart_state):
+        """Test cart persistence (basic test)"""
+        driver = cart_page.driver
+        initial_storage = driver.execute_script(_CART_STORAGE_SCRIPT)
+        
+        # Navigate away; the cart's storage entries should survive the page load
+        home_page = HomePage(driver)
+        home_page.load()
+        final_storage = driver.execute_script(_CART_STORAGE_SCRIPT)
+        assert initial_storage == final_storage, "Cart storage changed after navigation"
         
-        if cart_page.is_cart_empty():
+        if initial_storage == '{"ls":[],"ss":[]}':
+            # Theme keeps no cart in web storage; fall back to re-reading the cart page
+            cart_page.load()
+            final_empty = cart_page.is_cart_empty()
+            final_count = cart_page.get_cart_item_count() if not final_empty else 0
+            assert cart_state["empty"] == final_empty, "Cart empty state changed after navigation"
+            assert cart_state["count"] == final_count, "Cart item count changed after navigation"
+            
+    def test_cart_accessibility_features(self, cart_page):
+        """Test cart accessibility features"""
+        _return_to_cart(cart_page)
+        
+        # Check for proper headings
+        page_title = cart_page.get_page_title()
+        assert "cart" in page_title.lower(), "Page title should indicate cart page"
+        
+        # Check for main cart container
+        assert cart_page.is_element_visible(cart_page.CART_ITEMS, timeout=5) or cart_page.is_cart_empty(), "Cart container should be visible"
+            
+    def test_continue_shopping(self, cart_page):
+        """Test continue shopping functionality"""
+        _return_to_cart(cart_page)
+        
+        if cart_page.is_element_visible(cart_page.CONTINUE_SHOPPING_LINK, timeout=5):
+            cart_page.continue_shopping()
+            cart_page.wait_until(lambda d: "cart" not in d.current_url.lower())
+            
+            current_url = cart_page.get_current_url()
+            
+            # Should navigate away from cart page
+            assert "cart" not in current_url.lower(), "Continue shopping did not navigate away from cart"
+        else:
+            pytest.skip("Continue shopping button not available")
+            
+    def test_proceed_to_checkout(self, cart_page, cart_state):
+        """Test proceeding to checkout"""
+        if cart_state["empty"]:
             pytest.skip("Cart is empty - cannot test checkout")
             
         if cart_page.is_element_visible(cart_page.CHECKOUT_BUTTON, timeout=5):
             initial_url = cart_page.get_current_url()
             cart_page.proceed_to_checkout()
-            time.sleep(3)
+            cart_page.wait_until(EC.any_of(EC.url_contains("checkout"), EC.url_changes(initial_url)))
             
             final_url = cart_page.get_current_url()
             
@@ -205,76 +247,81 @@ class TestCartFunctionality:
         else:
             pytest.skip("Checkout button not available")
             
-    def test_continue_shopping(self, driver):
-        """Test continue shopping functionality"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        if cart_page.is_element_visible(cart_page.CONTINUE_SHOPPING, timeout=5):
-            cart_page.continue_shopping()
-            time.sleep(2)
+    def test_quantity_update_functionality(self, cart_page, cart_state):
+        """Test updating item quantity in cart"""
+        if cart_state["empty"]:
+            pytest.skip("Cart is empty - cannot test quantity update")
             
-            current_url = cart_page.get_current_url()
+        if cart_state["count"] == 0:
+            pytest.skip("No items in cart to update quantity")
             
-            # Should navigate away from cart page
-            assert "cart" not in current_url.lower(), "Continue shopping did not navigate away from cart"
-        else:
-            pytest.skip("Continue shopping button not available")
+        try:
+            # Get initial quantity for first item
+            initial_qty = cart_page.get_cart_snapshot_js()[0]["qty"]
+            
+            # Try to increase quantity
+            cart_page.increase_item_quantity(0)
+            cart_page.wait_until(EC.text_to_be_present_in_element_value(
+                cart_page.QUANTITY_INPUTS, str(initial_qty + 1)))
+            
+            # Check if quantity increased
+            new_qty = cart_page.get_cart_snapshot_js()[0]["qty"]
+            
+            if new_qty > initial_qty:
+                assert True, "Quantity increased successfully"
+            else:
+                # Try updating quantity directly
+                cart_page.update_item_quantity(0, 3)
+                cart_page.wait_until(EC.text_to_be_present_in_element_value(
+                    cart_page.QUANTITY_INPUTS, "3"))
+                
+                updated_qty = cart_page.get_cart_snapshot_js()[0]["qty"]
+                assert updated_qty != initial_qty or updated_qty == 3, "Quantity update functionality working"
+                
+        except Exception as e:
+            pytest.skip(f"Quantity update not available: {e}")
             
-    def test_cart_persistence_across_sessions(self, driver):
-        """Test cart persistence (basic test)"""
-        cart_page = CartPage(driver)
-        
-        # Check initial cart state
-        cart_page.open_cart_page()
-        initial_empty = cart_page.is_cart_empty()
-        initial_count = cart_page.get_cart_items_count() if not initial_empty else 0
-        
-        # Navigate away and back
-        home_page = HomePage(driver)
-        home_page.open_homepage()
-        time.sleep(1)
-        
-        cart_page.open_cart_page()
-        final_empty = cart_page.is_cart_empty()
-        final_count = cart_page.get_cart_items_count() if not final_empty else 0
-        
-        # Cart state should be consistent
-        assert initial_empty == final_empty, "Cart empty state changed after navigation"
-        assert initial_count == final_count, "Cart item count changed after navigation"
-        
     @pytest.mark.error_handling
-    def test_cart_error_handling(self, driver):
+    def test_cart_error_handling(self, cart_page, cart_state):
         """Test cart error scenarios"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
         # Test invalid quantity update
-        if not cart_page.is_cart_empty():
+        if not cart_state["empty"]:
             try:
                 # Try setting negative quantity
-                cart_page.update_quantity(0, -1)
-                time.sleep(1)
+                cart_page.update_item_quantity(0, -1)
+                cart_page.wait_until(
+                    lambda d: (cart_page.get_cart_snapshot_js() or [{}])[0].get("qty") != -1, timeout=5)
                 
                 # Should show error or prevent negative quantity
-                error_msg = cart_page.get_error_message()
-                quantity = cart_page.get_item_quantity(0)
+                error_shown = cart_page.is_element_visible(cart_page.ERROR_MESSAGE, timeout=0)
+                quantity = (cart_page.get_cart_snapshot_js() or [{"qty": 0}])[0]["qty"]
                 
-                assert error_msg or quantity >= 0, "Negative quantity should be prevented"
+                assert error_shown or quantity >= 0, "Negative quantity should be prevented"
                 
             except Exception as e:
                 pytest.skip(f"Quantity validation test not applicable: {e}")
         else:
             pytest.skip("Cart is empty - cannot test error handling")
             
-    def test_cart_accessibility_features(self, driver):
-        """Test cart accessibility features"""
-        cart_page = CartPage(driver)
-        cart_page.open_cart_page()
-        
-        # Check for proper headings
-        page_title = cart_page.get_page_title()
-        assert "cart" in page_title.lower(), "Page title should indicate cart page"
-        
-        # Check for main cart container
-        assert cart_page.is_element_visible(cart_page.CART_ITEMS_CONTAINER, timeout=5) or cart_page.is_cart_empty(), "Cart container should be visible"
+    def test_remove_item_from_cart(self, cart_page, cart_state):
+        """Test removing item from cart"""
+        if cart_state["empty"]:
+            pytest.skip("Cart is empty - cannot test item removal")
+            
+        initial_count = cart_state["count"]
+        if initial_count == 0:
+            pytest.skip("No items to remove")
+            
+        try:
+            # Remove first item and wait for its row to leave the DOM
+            first_row = cart_page.find_elements(cart_page.CART_ITEMS)[0]
+            cart_page.remove_item(0)
+            cart_page.wait_until(EC.staleness_of(first_row))
+            
+            # Check if item was removed
+            final_count = cart_page.get_cart_item_count()
+            
+            assert final_count < initial_count or cart_page.is_cart_empty(), "Item was not removed from cart"
+            
+        except Exception as e:
+            pytest.skip(f"Remove item functionality not available: {e}")
@@ -1,5 +1,6 @@
 import pytest
 import time
+from selenium.webdriver.support import expected_conditions as EC
 from pages.home_page import HomePage
 from pages.shop_page import ShopPage
 from pages.login_page import LoginPage
@@ -7,42 +8,126 @@ from pages.cart_page import CartPage
 from pages.wishlist_page import WishlistPage
 from config.config import Config
 
+_LONG_STR = "a" * 1000
+
+_INVALID_URLS = (
+    Config.BASE_URL + "invalid-page",
+    Config.BASE_URL + "404-test",
+    Config.BASE_URL + "non/existent/path"
+)
+
+_EXTREME_QUANTITIES = (0, -1, 999999, "abc", "<script>")
+
+_LOGIN_EDGE_CASES = (
+    {
+        "email": _LONG_STR,
+        "password": "test",
+        "description": "very long email"
+    },
+    {
+        "email": "test@",
+        "password": "",
+        "description": "incomplete email"
+    },
+    {
+        "email": "<script>alert('test')</script>",
+        "password": "test",
+        "description": "XSS attempt in email"
+    },
+    {
+        "email": "test@example.com",
+        "password": "'DROP TABLE users;--",
+        "description": "SQL injection attempt"
+    }
+)
+
+_SEARCH_EDGE_CASES = (
+    _LONG_STR,  # Very long string
+    "<script>alert('xss')</script>",  # XSS attempt
+    "'; DROP TABLE products; --",  # SQL injection
+    "\u0000\u0001\u0002",  # Control characters
+    "🏠👠👢",  # Emojis
+    "אִֵֶַָ"  # Non-Latin characters
+)
+_SEARCH_EDGE_CASE_IDS = ("long", "xss", "sql_injection", "control_chars", "emoji", "non_latin")
+
+_CLEAR_INPUTS_SCRIPT = """
+    document.querySelectorAll(arguments[0]).forEach(input => { input.value = ''; });
+"""
+
+@pytest.fixture(scope="module")
+def login_form_page(headless_session_driver):
+    """Login page opened once for all the login edge cases"""
+    page = LoginPage(headless_session_driver)
+    page.load()
+    return page
+
+@pytest.fixture
+def clean_login_form(login_form_page):
+    """Reset the login form in place, re-navigating only if a case left the page"""
+    if "login" in login_form_page.get_current_url().lower():
+        login_form_page.driver.execute_script(
+            _CLEAR_INPUTS_SCRIPT, "form input:not([type=hidden]):not([type=submit])"
+        )
+    else:
+        login_form_page.load()
+    return login_form_page
+
+@pytest.fixture(scope="module")
+def search_form_page(headless_session_driver):
+    """Shop page opened once for all the search edge cases"""
+    page = ShopPage(headless_session_driver)
+    page.open_shop_page()
+    return page
+
+@pytest.fixture
+def clean_search_form(search_form_page):
+    """Clear the search box on the current page; results pages keep one too"""
+    if search_form_page.is_element_present(search_form_page.SEARCH_INPUT):
+        search_form_page.driver.execute_script(_CLEAR_INPUTS_SCRIPT, search_form_page.SEARCH_INPUT[1])
+    else:
+        search_form_page.open_shop_page()
+    return search_form_page
+
 @pytest.mark.error_handling
 class TestErrorHandlingAndEdgeCases:
     """Test cases for error handling and edge cases"""
     
-    def test_invalid_url_handling(self, driver):
-        """Test handling of invalid URLs"""
+    def test_invalid_url_status_codes(self, driver):
+        """Test invalid URLs return not-found or redirect responses"""
         home_page = HomePage(driver)
+        home_page.load()
         
-        invalid_urls = [
-            Config.BASE_URL + "invalid-page",
-            Config.BASE_URL + "404-test",
-            Config.BASE_URL + "non/existent/path"
-        ]
+        for probe in home_page.probe_url_statuses(_INVALID_URLS):
+            handled = (
+                probe["status"] in (404, 410) or
+                probe["redirected"] or
+                (probe["status"] == 200 and probe["error_body"])
+            )
+            assert handled, f"Invalid URL {probe['url']} returned {probe['status']} without an error page"
+    
+    def test_invalid_url_handling(self, driver):
+        """Test the browser renders an invalid URL gracefully"""
+        home_page = HomePage(driver)
+        invalid_url = _INVALID_URLS[0]
         
-        for invalid_url in invalid_urls:
-            try:
-                home_page.open_url(invalid_url)
-                time.sleep(2)
-                
-                # Should handle gracefully - either show error page or redirect
-                current_url = home_page.get_current_url()
-                page_source = home_page.get_page_source()
-                
-                # Check for error handling
-                error_handled = (
-                    "404" in page_source.lower() or
-                    "not found" in page_source.lower() or
-                    "error" in page_source.lower() or
-                    current_url != invalid_url  # Redirected
-                )
-                
-                assert error_handled, f"Invalid URL {invalid_url} should be handled gracefully"
-                
-            except Exception as e:
-                # Exception is also acceptable error handling
-                assert True, f"Invalid URL handled with exception: {e}"
+        try:
+            home_page.open_url(invalid_url)
+            
+            # Should handle gracefully - either show error page or redirect
+            current_url = home_page.get_current_url()
+            
+            # Check for error handling
+            error_handled = (
+                home_page.page_contains_error() or
+                current_url != invalid_url  # Redirected
+            )
+            
+            assert error_handled, f"Invalid URL {invalid_url} should be handled gracefully"
+            
+        except Exception as e:
+            # Exception is also acceptable error handling
+            assert True, f"Invalid URL handled with exception: {e}"
                 
     def test_network_timeout_handling(self, driver):
         """Test network timeout handling"""
@@ -55,7 +140,6 @@ class TestErrorHandlingAndEdgeCases:
         try:
             # This might timeout
             home_page.open_homepage()
-            time.sleep(1)
             
             # If it loads despite short timeout, that's fine
             assert home_page.is_homepage_loaded(), "Page loaded despite short timeout"
@@ -78,7 +162,6 @@ class TestErrorHandlingAndEdgeCases:
             
             # Page should still be functional for basic operations
             home_page.open_homepage()
-            time.sleep(2)
             
             # Basic elements should still be visible
             logo_visible = home_page.is_element_visible(home_page.LOGO, timeout=5)
@@ -89,125 +172,73 @@ class TestErrorHandlingAndEdgeCases:
         except Exception as e:
             pytest.skip(f"JavaScript disable test not applicable: {e}")
             
-    def test_form_validation_edge_cases(self, driver):
+    @pytest.mark.parametrize("case", _LOGIN_EDGE_CASES, ids=lambda case: case["description"])
+    def test_form_validation_edge_cases(self, clean_login_form, case):
         """Test form validation with edge cases"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = clean_login_form
         
-        if not login_page.is_element_visible(login_page.LOGIN_EMAIL_INPUT, timeout=5):
+        if not login_page.is_element_visible(login_page.EMAIL_INPUT, timeout=5):
             pytest.skip("Login form not available for validation testing")
             
-        edge_cases = [
-            {
-                "email": "" * 1000,  # Very long empty string
-                "password": "test",
-                "description": "very long empty email"
-            },
-            {
-                "email": "test@",
-                "password": "",
-                "description": "incomplete email"
-            },
-            {
-                "email": "<script>alert('test')</script>",
-                "password": "test",
-                "description": "XSS attempt in email"
-            },
-            {
-                "email": "test@example.com",
-                "password": "'DROP TABLE users;--",
-                "description": "SQL injection attempt"
-            }
-        ]
-        
-        for case in edge_cases:
-            try:
-                login_page.login(case["email"], case["password"])
-                time.sleep(1)
-                
-                # Should either show validation error or handle securely
-                error_msg = login_page.get_error_message()
-                validation_errors = login_page.get_validation_errors()
-                is_logged_in = login_page.is_logged_in()
-                
-                # Should not log in with invalid/malicious data
-                assert not is_logged_in or error_msg or validation_errors, f"Should handle {case['description']} securely"
-                
-                # Clear form for next test
-                login_page.open_login_page()
-                
-            except Exception as e:
-                # Form submission failure is acceptable
-                assert True, f"Form validation handled edge case: {case['description']}"
+        try:
+            login_page.login(case["email"], case["password"])
+            
+            # Should either show validation error or handle securely
+            error_shown = login_page.any_error_visible()
+            is_logged_in = login_page.is_logged_in()
+            
+            # Should not log in with invalid/malicious data
+            assert not is_logged_in or error_shown, f"Should handle {case['description']} securely"
+            
+        except Exception as e:
+            # Form submission failure is acceptable
+            assert True, f"Form validation handled edge case: {case['description']}"
                 
-    def test_cart_edge_cases(self, driver):
+    @pytest.mark.parametrize("qty", _EXTREME_QUANTITIES, ids=["zero", "negative", "huge", "letters", "script"])
+    def test_cart_edge_cases(self, driver, qty):
         """Test cart functionality edge cases"""
         cart_page = CartPage(driver)
-        cart_page.open_cart_page()
+        cart_page.load()
         
         if cart_page.is_cart_empty():
             pytest.skip("Cart is empty - cannot test edge cases")
             
         try:
-            # Test extreme quantity values
-            extreme_quantities = [0, -1, 999999, "abc", "<script>"]
+            # The cart re-renders its rows after an update
+            quantity_input = cart_page.find_element(cart_page.QUANTITY_INPUTS)
+            cart_page.update_item_quantity(0, qty)
+            cart_page.wait_until(EC.staleness_of(quantity_input), timeout=5)
             
-            for qty in extreme_quantities:
-                try:
-                    cart_page.update_quantity(0, qty)
-                    time.sleep(1)
-                    
-                    # Should handle invalid quantities gracefully
-                    error_msg = cart_page.get_error_message()
-                    current_qty = cart_page.get_item_quantity(0)
-                    
-                    # Should either show error or prevent invalid quantity
-                    if qty in [0, -1] and isinstance(qty, int):
-                        assert current_qty > 0 or error_msg, f"Should handle quantity {qty} appropriately"
-                    elif not isinstance(qty, int):
-                        assert error_msg or current_qty > 0, f"Should handle non-numeric quantity {qty}"
-                        
-                except Exception as e:
-                    # Exception handling is acceptable
-                    assert True, f"Quantity edge case {qty} handled with exception: {e}"
-                    
+            # Should handle invalid quantities gracefully
+            error_msg = cart_page.is_element_visible(cart_page.ERROR_MESSAGE, timeout=0)
+            current_qty = cart_page.get_cart_snapshot_js()[0]["qty"]
+            
+            # Should either show error or prevent invalid quantity
+            if qty in [0, -1] and isinstance(qty, int):
+                assert current_qty > 0 or error_msg, f"Should handle quantity {qty} appropriately"
+            elif not isinstance(qty, int):
+                assert error_msg or current_qty > 0, f"Should handle non-numeric quantity {qty}"
+                
         except Exception as e:
-            pytest.skip(f"Cart edge case testing not applicable: {e}")
+            # Exception handling is acceptable
+            assert True, f"Quantity edge case {qty} handled with exception: {e}"
             
-    def test_search_edge_cases(self, driver):
+    @pytest.mark.parametrize("search_term", _SEARCH_EDGE_CASES, ids=_SEARCH_EDGE_CASE_IDS)
+    def test_search_edge_cases(self, clean_search_form, search_term):
         """Test search functionality edge cases"""
-        shop_page = ShopPage(driver)
-        shop_page.open_shop_page()
-        
-        edge_case_searches = [
-            "" * 1000,  # Very long empty string
-            "<script>alert('xss')</script>",  # XSS attempt
-            "'; DROP TABLE products; --",  # SQL injection
-            "\u0000\u0001\u0002",  # Control characters
-            "🏠👠👢",  # Emojis
-            "אִֵֶַָ"  # Non-Latin characters
-        ]
+        shop_page = clean_search_form
         
-        for search_term in edge_case_searches:
-            try:
-                shop_page.search_products(search_term)
-                time.sleep(2)
-                
-                # Should handle search gracefully
-                current_url = shop_page.get_current_url()
-                page_source = shop_page.get_page_source()
-                
-                # Should not crash or show errors
-                no_server_error = "500" not in page_source and "error" not in page_source.lower()
-                assert no_server_error, f"Search with '{repr(search_term)}' should not cause server error"
-                
-                # Reset to clean state
-                shop_page.open_shop_page()
-                time.sleep(1)
-                
-            except Exception as e:
-                # Exception handling is acceptable for edge cases
-                assert True, f"Search edge case handled: {e}"
+        try:
+            shop_page.search_products(search_term)
+            shop_page.wait_for_page_load()
+            
+            # Should not crash or show errors
+            no_server_error = not shop_page.page_shows_server_error()
+            assert no_server_error, f"Search with '{repr(search_term)}' should not cause server error"
+            
+        except Exception as e:
+            # Exception handling is acceptable for edge cases
+            assert True, f"Search edge case handled: {e}"
                 
     def test_concurrent_user_simulation(self, driver):
         """Test behavior under simulated concurrent usage"""
@@ -227,7 +258,6 @@ class TestErrorHandlingAndEdgeCases:
             for _ in range(3):  # Rapid navigation cycles
                 for page_func in pages:
                     page_func()
-                    time.sleep(0.5)  # Very short delay
                     
             # Should still be functional after rapid navigation
             home_page.open_homepage()
@@ -241,12 +271,12 @@ class TestErrorHandlingAndEdgeCases:
         home_page = HomePage(driver)
         
         try:
-            # Perform repeated operations
+            # Perform repeated operations on the loaded page; reloading each
+            # time only measured page loads, not the scroll/memory path
+            home_page.open_homepage()
             for i in range(10):  # Reduced from higher number for CI
-                home_page.open_homepage()
                 home_page.scroll_to_bottom()
                 home_page.scroll_to_top()
-                time.sleep(0.1)
                 
             # Should still be responsive
             final_load_start = time.time()
@@ -283,6 +313,7 @@ class TestErrorHandlingAndEdgeCases:
         except Exception as e:
             pytest.skip(f"Browser compatibility test failed: {e}")
             
+    @pytest.mark.needs_images  # asserts the logo image stays visible after the resize
     @pytest.mark.parametrize("window_size", [(800, 600), (1024, 768), (1920, 1080)])
     def test_window_resize_handling(self, driver, window_size):
         """Test handling of window resize events"""
@@ -291,9 +322,8 @@ class TestErrorHandlingAndEdgeCases:
         
         # Resize window
         driver.set_window_size(window_size[0], window_size[1])
-        time.sleep(1)
         
-        # Page should still be functional
+        # Page should still be functional (is_element_visible waits for the re-layout)
         assert home_page.is_element_visible(home_page.LOGO, timeout=5), f"Logo should be visible at {window_size}"
         
         # Navigation should still work
@@ -302,4 +332,4 @@ class TestErrorHandlingAndEdgeCases:
         assert nav_working, f"Navigation should work at {window_size}"
         
         # Reset window size
-        driver.set_window_size(*Config.BROWSER_WINDOW_SIZE)
+        driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
@@ -1,89 +1,106 @@
 """Forgot password functionality tests"""
 
+import json
 import pytest
 import logging
 from pages.home_page import HomePage
-from pages.login_page import LoginPage
-from pages.forgot_password_page import ForgotPasswordPage
 from config.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Keep the module on one xdist worker (--dist=loadgroup) so its tests reuse one warm browser
+pytestmark = pytest.mark.xdist_group("forgot_password")
+
+# Candidate forgot-password URLs, most likely first
+_FORGOT_PASSWORD_URLS = (
+    Config.FORGOT_URL,
+    f"{Config.BASE_URL}account/recover",
+    f"{Config.BASE_URL}pages/forgot-password",
+    f"{Config.BASE_URL}account/reset"
+)
+
+# Invalid email formats for the field validation test
+_INVALID_EMAILS = (
+    "invalid-email",
+    "@example.com",
+    "test@",
+    "test.example.com",
+    "test..test@example.com"
+)
+
+# Built once with the candidates inlined: HEAD-probes them all in parallel from
+# the browser and resolves with the first candidate (in the order above) that is live
+_FORGOT_PASSWORD_PROBE_SCRIPT = """
+    const done = arguments[arguments.length - 1];
+    const candidates = %s;
+    Promise.allSettled(candidates.map(url =>
+        fetch(url.split("#")[0], {method: "HEAD"}).then(r => r.ok ? url : Promise.reject(r.status))
+    )).then(results => {
+        const live = results.find(result => result.status === "fulfilled");
+        done(live ? live.value : null);
+    });
+""" % json.dumps(_FORGOT_PASSWORD_URLS)
+
+@pytest.fixture(scope="session")
+def forgot_password_url(session_driver):
+    """First live forgot-password URL, found by probing every candidate in parallel"""
+    # fetch() needs a same-origin page to read the response statuses
+    if not session_driver.current_url.startswith(Config.BASE_URL):
+        HomePage(session_driver).load()
+    return session_driver.execute_async_script(_FORGOT_PASSWORD_PROBE_SCRIPT) or _FORGOT_PASSWORD_URLS[0]
+
 class TestForgotPassword:
     """Test suite for forgot password functionality"""
     
     @pytest.mark.smoke
-    def test_forgot_password_page_loads(self, driver):
+    def test_forgot_password_page_loads(self, forgot_page):
         """Test that forgot password page loads successfully"""
+        forgot_page.go_to(Config.FORGOT_URL)
+        assert forgot_page.is_loaded(), "Forgot password page should load successfully"
+        logger.info("Forgot password page loaded via direct navigation")
+    
+    @pytest.mark.click_flow
+    def test_forgot_password_reachable_from_homepage(self, home_page, login_page, forgot_page):
+        """Test that the forgot password page is reachable by clicking through from the homepage"""
         # Navigate to login page first
-        home_page = HomePage(driver)
         home_page.load()
         
-        success = home_page.click_login_link()
-        if success:
-            login_page = LoginPage(driver)
-            if login_page.is_loaded():
-                # Click forgot password link
-                forgot_success = login_page.click_forgot_password()
-                if forgot_success:
-                    forgot_page = ForgotPasswordPage(driver)
-                    assert forgot_page.is_loaded(), "Forgot password page should load successfully"
-                    logger.info("Forgot password page loaded successfully")
-                else:
-                    # Try direct navigation
-                    forgot_page = ForgotPasswordPage(driver)
-                    forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
-                    if forgot_page.is_loaded():
-                        logger.info("Forgot password page loaded via direct navigation")
-                    else:
-                        pytest.skip("Forgot password page not accessible")
-            else:
-                pytest.skip("Login page not accessible")
-        else:
+        if not home_page.click_login_link():
             pytest.skip("Could not access login page")
+        if not login_page.is_loaded():
+            pytest.skip("Login page not accessible")
+        if not login_page.click_forgot_password():
+            pytest.skip("Forgot password link not clickable")
+        
+        assert forgot_page.is_loaded(), "Forgot password page should load successfully"
+        logger.info("Forgot password page loaded successfully")
     
-    def test_forgot_password_form_elements(self, driver):
+    def test_forgot_password_form_elements(self, forgot_page, forgot_password_url):
         """Test that forgot password form has required elements"""
-        # Try direct navigation to forgot password page
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(forgot_password_url)
         
         if not forgot_page.is_loaded():
-            # Try alternative URLs
-            alternative_urls = [
-                "https://instylekenya.co.ke/account/recover",
-                "https://instylekenya.co.ke/pages/forgot-password",
-                "https://instylekenya.co.ke/account/reset"
-            ]
-            
-            for url in alternative_urls:
-                forgot_page.go_to(url)
-                if forgot_page.is_loaded():
-                    break
-            else:
-                pytest.skip("Forgot password page not found")
+            pytest.skip("Forgot password page not found")
         
-        # Check required form elements
-        assert forgot_page.is_form_valid(), "Forgot password form should have required elements"
-        assert forgot_page.is_element_present(forgot_page.EMAIL_INPUT), "Email input should be present"
-        assert forgot_page.is_element_present(forgot_page.SUBMIT_BUTTON), "Submit button should be present"
+        # Check required form elements, title and instructions from one snapshot
+        form = forgot_page.get_form_snapshot()
+        assert form["email_input"] is not None, "Email input should be present"
+        assert form["submit_button"] is not None, "Submit button should be present"
         
-        # Check page title and instructions
-        page_title = forgot_page.get_page_title_text()
-        instructions = forgot_page.get_instructions_text()
+        page_title = form["page_title"]
+        instructions = form["instructions"]
         
         assert page_title, "Forgot password page should have a title"
-        logger.info(f"Forgot password page title: '{page_title}'")
+        logger.info("Forgot password page title: '%s'", page_title)
         
         if instructions:
-            logger.info(f"Instructions text: '{instructions}'")
+            logger.info("Instructions text: '%s'", instructions)
         
         logger.info("Forgot password form elements test passed")
     
-    def test_valid_email_reset_request(self, driver, test_user_data):
+    def test_valid_email_reset_request(self, forgot_page, test_user_data):
         """Test password reset with valid email"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -91,23 +108,23 @@ class TestForgotPassword:
         # Submit password reset with valid email format
         success = forgot_page.reset_password(test_user_data["email"])
         
+        feedback = forgot_page.get_feedback()
         if success:
             # Check for success message
-            success_msg = forgot_page.get_success_message()
+            success_msg = feedback["success"]
             if success_msg:
                 assert success_msg, "Should show success message after valid email submission"
-                logger.info(f"Password reset success message: '{success_msg}'")
+                logger.info("Password reset success message: '%s'", success_msg)
             else:
                 logger.info("Password reset request submitted (no explicit success message)")
         else:
             # Check for error message
-            error_msg = forgot_page.get_error_message()
-            logger.info(f"Password reset request failed: '{error_msg}'")
+            error_msg = feedback["error"]
+            logger.info("Password reset request failed: '%s'", error_msg)
     
-    def test_invalid_email_reset_request(self, driver, invalid_user_data):
+    def test_invalid_email_reset_request(self, forgot_page, invalid_user_data):
         """Test password reset with invalid email format"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -119,16 +136,15 @@ class TestForgotPassword:
         error_msg = forgot_page.get_error_message()
         
         if error_msg:
-            logger.info(f"Invalid email correctly rejected: '{error_msg}'")
+            logger.info("Invalid email correctly rejected: '%s'", error_msg)
         elif not success:
             logger.info("Invalid email submission prevented")
         else:
             logger.warning("Invalid email was accepted (unexpected)")
     
-    def test_empty_email_reset_request(self, driver):
+    def test_empty_email_reset_request(self, forgot_page):
         """Test password reset with empty email"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -140,16 +156,15 @@ class TestForgotPassword:
         error_msg = forgot_page.get_error_message()
         
         if error_msg:
-            logger.info(f"Empty email correctly rejected: '{error_msg}'")
+            logger.info("Empty email correctly rejected: '%s'", error_msg)
         elif not success:
             logger.info("Empty email submission prevented")
         else:
             logger.warning("Empty email was accepted (unexpected)")
     
-    def test_nonexistent_email_reset_request(self, driver, invalid_user_data):
+    def test_nonexistent_email_reset_request(self, forgot_page, invalid_user_data):
         """Test password reset with nonexistent email"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -158,20 +173,19 @@ class TestForgotPassword:
         success = forgot_page.reset_password(invalid_user_data["nonexistent_email"])
         
         # Behavior might vary - some sites show success for security, others show error
-        success_msg = forgot_page.get_success_message()
-        error_msg = forgot_page.get_error_message()
+        feedback = forgot_page.get_feedback()
+        success_msg, error_msg = feedback["success"], feedback["error"]
         
         if success_msg:
-            logger.info(f"Nonexistent email handled with success message (security): '{success_msg}'")
+            logger.info("Nonexistent email handled with success message (security): '%s'", success_msg)
         elif error_msg:
-            logger.info(f"Nonexistent email rejected with error: '{error_msg}'")
+            logger.info("Nonexistent email rejected with error: '%s'", error_msg)
         else:
             logger.info("Nonexistent email request processed")
     
-    def test_back_to_login_link(self, driver):
+    def test_back_to_login_link(self, forgot_page, login_page):
         """Test back to login link functionality"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -181,7 +195,6 @@ class TestForgotPassword:
             
             if success:
                 # Should navigate back to login page
-                login_page = LoginPage(driver)
                 assert login_page.is_loaded(), "Should navigate back to login page"
                 logger.info("Back to login link works correctly")
             else:
@@ -189,10 +202,9 @@ class TestForgotPassword:
         else:
             logger.info("Back to login link not found")
     
-    def test_register_link_from_forgot_password(self, driver):
+    def test_register_link_from_forgot_password(self, driver, forgot_page):
         """Test register link from forgot password page"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -210,42 +222,37 @@ class TestForgotPassword:
         else:
             logger.info("Register link not found on forgot password page")
     
-    def test_email_field_validation(self, driver):
+    @pytest.mark.parametrize("invalid_email", _INVALID_EMAILS)
+    def test_email_field_validation(self, forgot_page, invalid_email):
         """Test email field validation"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
         
-        # Test various invalid email formats
-        invalid_emails = [
-            "invalid-email",
-            "@example.com",
-            "test@",
-            "test.example.com",
-            "test..test@example.com"
-        ]
+        email_input = forgot_page.find_element(forgot_page.EMAIL_INPUT)
+        email_input.clear()
         
-        for invalid_email in invalid_emails:
-            forgot_page.clear_email_field()
-            
-            # Try submitting invalid email
-            success = forgot_page.reset_password(invalid_email)
-            
-            if not success:
-                logger.info(f"Invalid email '{invalid_email}' correctly prevented")
-            else:
-                error_msg = forgot_page.get_error_message()
-                if error_msg:
-                    logger.info(f"Invalid email '{invalid_email}' rejected: '{error_msg}'")
-                else:
-                    logger.warning(f"Invalid email '{invalid_email}' was accepted")
+        # Try submitting invalid email
+        email_input.send_keys(invalid_email)
+        forgot_page.find_element(forgot_page.SUBMIT_BUTTON).click()
+        forgot_page.wait_for_page_load()
+        
+        # The browser's own type=email check blocks the submit before the server sees it
+        validation_msg = email_input.get_attribute("validationMessage")
+        
+        error_msg = forgot_page.get_error_message()
+        if validation_msg:
+            logger.info("Invalid email '%s' correctly prevented: '%s'", invalid_email, validation_msg)
+        elif error_msg:
+            logger.info("Invalid email '%s' rejected: '%s'", invalid_email, error_msg)
+        else:
+            logger.warning("Invalid email '%s' was accepted", invalid_email)
     
-    def test_multiple_reset_requests(self, driver, test_user_data):
+    @pytest.mark.serial
+    def test_multiple_reset_requests(self, forgot_page, test_user_data):
         """Test multiple password reset requests"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -254,9 +261,8 @@ class TestForgotPassword:
         success1 = forgot_page.reset_password(test_user_data["email"])
         
         if success1:
-            # Wait a moment and submit another request
-            import time
-            time.sleep(2)
+            # Wait (at most 2 s) until the form can take another request
+            forgot_page.wait_until(lambda _: forgot_page.is_form_ready_for_resubmit(), timeout=2, poll_frequency=0.05)
             
             forgot_page.clear_email_field()
             success2 = forgot_page.reset_password(test_user_data["email"])
@@ -265,38 +271,37 @@ class TestForgotPassword:
                 logger.info("Multiple password reset requests allowed")
             else:
                 error_msg = forgot_page.get_error_message()
-                logger.info(f"Multiple reset requests handled: '{error_msg}'")
+                logger.info("Multiple reset requests handled: '%s'", error_msg)
         else:
             logger.info("First reset request failed, skipping multiple request test")
     
     @pytest.mark.regression
-    def test_forgot_password_page_security(self, driver):
+    def test_forgot_password_page_security(self, forgot_page):
         """Test forgot password page security features"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
         
-        # Check that form uses POST method (security best practice)
-        form_element = forgot_page.find_element(forgot_page.FORM)
-        form_method = form_element.get_attribute("method")
+        form = forgot_page.get_form_snapshot()
+        assert form["found"], "Forgot password form should be present"
         
+        # Check that form uses POST method (security best practice)
+        form_method = form["method"]
         if form_method:
             assert form_method.lower() == "post", "Password reset form should use POST method"
             logger.info("Form uses POST method (secure)")
         
         # Check for CSRF protection (form should have hidden fields)
-        hidden_inputs = form_element.find_elements_by_css_selector("input[type='hidden']")
-        if len(hidden_inputs) > 0:
-            logger.info(f"Found {len(hidden_inputs)} hidden inputs (possible CSRF protection)")
+        hidden_inputs = form["hidden_inputs"]
+        if hidden_inputs > 0:
+            logger.info("Found %d hidden inputs (possible CSRF protection)", hidden_inputs)
         else:
             logger.info("No hidden inputs found")
     
-    def test_form_submission_feedback(self, driver, test_user_data):
+    def test_form_submission_feedback(self, forgot_page, test_user_data):
         """Test that form provides appropriate feedback after submission"""
-        forgot_page = ForgotPasswordPage(driver)
-        forgot_page.go_to("https://instylekenya.co.ke/account/login#recover")
+        forgot_page.go_to(Config.FORGOT_URL)
         
         if not forgot_page.is_loaded():
             pytest.skip("Forgot password page not accessible")
@@ -305,15 +310,15 @@ class TestForgotPassword:
         success = forgot_page.reset_password(test_user_data["email"])
         
         # Should get either success or error message
-        success_msg = forgot_page.get_success_message()
-        error_msg = forgot_page.get_error_message()
+        feedback = forgot_page.get_feedback()
+        success_msg, error_msg = feedback["success"], feedback["error"]
         
         feedback_provided = bool(success_msg or error_msg or success)
         assert feedback_provided, "Form should provide feedback after submission"
         
         if success_msg:
-            logger.info(f"Success feedback provided: '{success_msg}'")
+            logger.info("Success feedback provided: '%s'", success_msg)
         elif error_msg:
-            logger.info(f"Error feedback provided: '{error_msg}'")
+            logger.info("Error feedback provided: '%s'", error_msg)
         else:
             logger.info("Form submission processed (implicit feedback)")
@@ -8,9 +8,53 @@ from config.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Keep the module on one xdist worker (--dist=loadgroup); tests that log in to or
+# submit against the shared test account use the "auth" group instead, so they
+# never run concurrently with each other across modules
+pytestmark = pytest.mark.xdist_group("login")
+
+@pytest.fixture(scope="class")
+def login_page(headless_session_driver):
+    """Login page loaded once and shared by the tests that do not sign in
+    
+    Tests still call load(), which only navigates if an earlier test left the
+    page, and reset() before typing. Tests that sign in keep the function-scoped
+    driver, which clears cookies first.
+    """
+    headless_session_driver.delete_all_cookies()
+    page = LoginPage(headless_session_driver)
+    page.load()
+    return page
+
+# Credentials are literals or (fixture name, key) pairs, resolved only by the case that needs them
+_FAILED_LOGIN_CASES = [
+    pytest.param(("invalid_user_data", "invalid_email"), "somepassword", id="invalid_email"),
+    pytest.param("", "", id="empty"),
+    pytest.param(("invalid_user_data", "nonexistent_email"), ("invalid_user_data", "wrong_password"), id="nonexistent_user"),
+    # Submits against the shared test account, so it shares the "auth" group
+    pytest.param(("test_user_data", "email"), ("invalid_user_data", "wrong_password"), id="wrong_password",
+                 marks=pytest.mark.xdist_group("auth")),
+]
+
+def _resolve_credential(request, value):
+    """Return a literal credential, or look a (fixture, key) pair up in its fixture"""
+    if isinstance(value, tuple):
+        fixture_name, key = value
+        return request.getfixturevalue(fixture_name)[key]
+    return value
+
+# Nothing here checks images, so the whole class runs on the lean headless browser
+@pytest.mark.headless
 class TestLogin:
     """Test suite for login functionality"""
     
+    @pytest.fixture(autouse=True)
+    def _setup(self, login_page):
+        """Expose the class-scoped login page as self.login_page, signed out"""
+        # A sign-in test earlier in the class may have left a session cookie on this browser
+        login_page.driver.delete_all_cookies()
+        self.login_page = login_page
+    
     @pytest.mark.login
     @pytest.mark.smoke
     def test_login_page_loads(self, driver):
@@ -29,6 +73,7 @@ class TestLogin:
     
     @pytest.mark.login
     @pytest.mark.smoke
+    @pytest.mark.xdist_group("auth")
     def test_valid_login(self, driver, test_user_data):
         """Test login with valid credentials"""
         login_page = LoginPage(driver)
@@ -50,69 +95,28 @@ class TestLogin:
             logger.warning(f"Login failed (may be expected if test user doesn't exist): {error_msg}")
     
     @pytest.mark.login
-    def test_invalid_email_login(self, driver, invalid_user_data):
-        """Test login with invalid email format"""
-        login_page = LoginPage(driver)
-        login_page.load()
+    @pytest.mark.parametrize("email,password", _FAILED_LOGIN_CASES)
+    def test_login_failures(self, request, email, password):
+        """Test that login with bad credentials fails or shows an error"""
+        login_page = self.login_page.load()
+        login_page.reset()
         
         success = login_page.login(
-            email=invalid_user_data["invalid_email"],
-            password="somepassword"
+            email=_resolve_credential(request, email),
+            password=_resolve_credential(request, password)
         )
         
-        assert not success or login_page.get_error_message(), "Login with invalid email should fail or show error"
-        logger.info("Invalid email login test passed")
-    
-    @pytest.mark.login
-    def test_empty_credentials_login(self, driver):
-        """Test login with empty credentials"""
-        login_page = LoginPage(driver)
-        login_page.load()
-        
-        success = login_page.login(email="", password="")
-        
-        assert not success or login_page.get_error_message(), "Login with empty credentials should fail"
-        logger.info("Empty credentials login test passed")
-    
-    @pytest.mark.login
-    def test_nonexistent_user_login(self, driver, invalid_user_data):
-        """Test login with nonexistent user"""
-        login_page = LoginPage(driver)
-        login_page.load()
-        
-        success = login_page.login(
-            email=invalid_user_data["nonexistent_email"],
-            password=invalid_user_data["wrong_password"]
-        )
-        
-        assert not success or login_page.get_error_message(), "Login with nonexistent user should fail"
-        
         error_msg = login_page.get_error_message()
-        if error_msg:
-            logger.info(f"Nonexistent user login failed as expected: {error_msg}")
-        else:
-            logger.info("Nonexistent user login test passed")
-    
-    @pytest.mark.login
-    def test_wrong_password_login(self, driver, test_user_data, invalid_user_data):
-        """Test login with correct email but wrong password"""
-        login_page = LoginPage(driver)
-        login_page.load()
-        
-        success = login_page.login(
-            email=test_user_data["email"],
-            password=invalid_user_data["wrong_password"]
-        )
-        
-        assert not success or login_page.get_error_message(), "Login with wrong password should fail"
+        scenario = request.node.callspec.id
+        assert not success or error_msg, f"Login with {scenario} credentials should fail or show error"
         
-        error_msg = login_page.get_error_message()
         if error_msg:
-            logger.info(f"Wrong password login failed as expected: {error_msg}")
+            logger.info(f"{scenario} login failed as expected: {error_msg}")
         else:
-            logger.info("Wrong password login test passed")
+            logger.info(f"{scenario} login test passed")
     
     @pytest.mark.login
+    @pytest.mark.xdist_group("auth")
     def test_remember_me_functionality(self, driver, test_user_data):
         """Test remember me checkbox functionality"""
         login_page = LoginPage(driver)
@@ -132,17 +136,16 @@ class TestLogin:
             logger.info("Remember me checkbox not found on login page")
     
     @pytest.mark.login
-    def test_forgot_password_link(self, driver):
+    def test_forgot_password_link(self):
         """Test forgot password link functionality"""
-        login_page = LoginPage(driver)
-        login_page.load()
+        login_page = self.login_page.load()
         
         if login_page.is_element_present(login_page.FORGOT_PASSWORD_LINK):
             success = login_page.click_forgot_password()
             
             if success:
                 assert success, "Should be able to click forgot password link"
-                current_url = driver.current_url.lower()
+                current_url = login_page.get_current_url().lower()
                 assert "forgot" in current_url or "recover" in current_url, "Should navigate to password recovery page"
                 logger.info("Forgot password link test passed")
             else:
@@ -151,17 +154,16 @@ class TestLogin:
             logger.info("Forgot password link not found")
     
     @pytest.mark.login
-    def test_create_account_link(self, driver):
+    def test_create_account_link(self):
         """Test create account link functionality"""
-        login_page = LoginPage(driver)
-        login_page.load()
+        login_page = self.login_page.load()
         
         if login_page.is_element_present(login_page.CREATE_ACCOUNT_LINK):
             success = login_page.click_create_account()
             
             if success:
                 assert success, "Should be able to click create account link"
-                current_url = driver.current_url.lower()
+                current_url = login_page.get_current_url().lower()
                 assert "register" in current_url or "signup" in current_url, "Should navigate to registration page"
                 logger.info("Create account link test passed")
             else:
@@ -170,19 +172,19 @@ class TestLogin:
             logger.info("Create account link not found")
     
     @pytest.mark.login
-    def test_login_form_validation(self, driver):
+    def test_login_form_validation(self):
         """Test login form field validation"""
-        login_page = LoginPage(driver)
-        login_page.load()
+        login_page = self.login_page.load()
+        login_page.reset()
         
         # Test form clearing
-        login_page.send_keys_to_element(login_page.EMAIL_INPUT, "test@example.com")
-        login_page.send_keys_to_element(login_page.PASSWORD_INPUT, "testpassword")
+        login_page.fast_type(login_page.EMAIL_INPUT, "test@example.com")
+        login_page.fast_type(login_page.PASSWORD_INPUT, "testpassword")
         
         login_page.clear_form()
         
-        email_value = login_page.get_element_attribute(login_page.EMAIL_INPUT, "value")
-        password_value = login_page.get_element_attribute(login_page.PASSWORD_INPUT, "value")
+        email_value = login_page.find_element_cached(login_page.EMAIL_INPUT).get_attribute("value")
+        password_value = login_page.find_element_cached(login_page.PASSWORD_INPUT).get_attribute("value")
         
         assert email_value == "", "Email field should be cleared"
         assert password_value == "", "Password field should be cleared"
@@ -190,23 +192,31 @@ class TestLogin:
     
     @pytest.mark.login
     @pytest.mark.regression
-    def test_login_page_elements(self, driver):
+    def test_login_page_elements(self):
         """Test that all required login page elements are present"""
-        login_page = LoginPage(driver)
-        login_page.load()
+        login_page = self.login_page.load()
+        
+        # Read the form elements and page title in one script call; absent elements are None
+        snapshot = login_page.snapshot_form(login_page.LOGIN_FORM, {
+            "email": login_page.EMAIL_INPUT,
+            "password": login_page.PASSWORD_INPUT,
+            "button": login_page.LOGIN_BUTTON,
+            "title": login_page.PAGE_TITLE
+        })
         
         # Check required form elements
-        assert login_page.is_element_present(login_page.EMAIL_INPUT), "Email input should be present"
-        assert login_page.is_element_present(login_page.PASSWORD_INPUT), "Password input should be present"
-        assert login_page.is_element_present(login_page.LOGIN_BUTTON), "Login button should be present"
+        assert snapshot["email"] is not None, "Email input should be present"
+        assert snapshot["password"] is not None, "Password input should be present"
+        assert snapshot["button"] is not None, "Login button should be present"
         
         # Check page title
-        page_title = login_page.get_page_title_text()
+        page_title = snapshot["title"]
         assert page_title, "Login page should have a title"
         
         logger.info(f"Login page elements test passed. Page title: '{page_title}'")
     
     @pytest.mark.login
+    @pytest.mark.xdist_group("auth")
     def test_login_with_enter_key(self, driver, test_user_data):
         """Test login by pressing Enter key instead of clicking button"""
         from selenium.webdriver.common.keys import Keys
@@ -214,15 +224,11 @@ class TestLogin:
         login_page = LoginPage(driver)
         login_page.load()
         
-        # Enter credentials
-        login_page.send_keys_to_element(login_page.EMAIL_INPUT, test_user_data["email"])
-        login_page.send_keys_to_element(login_page.PASSWORD_INPUT, test_user_data["password"])
-        
-        # Press Enter in password field
-        password_field = login_page.find_element(login_page.PASSWORD_INPUT)
-        password_field.send_keys(Keys.RETURN)
+        # Enter credentials; the password is typed for real so Enter submits the form
+        login_page.fast_type(login_page.EMAIL_INPUT, test_user_data["email"])
+        login_page.send_keys_to_element(login_page.PASSWORD_INPUT, test_user_data["password"] + Keys.RETURN)
         
-        login_page.wait_for_page_load()
+        login_page.await_navigation()
         
         # Check if login was successful (redirected away from login page or no error)
         login_successful = "login" not in driver.current_url.lower()
@@ -237,23 +243,24 @@ class TestLogin:
     
     @pytest.mark.login
     @pytest.mark.regression
+    @pytest.mark.xdist_group("auth")
     def test_login_security_features(self, driver, test_user_data):
         """Test login security features"""
         login_page = LoginPage(driver)
         login_page.load()
         
         # Test password field is masked
-        password_field = login_page.find_element(login_page.PASSWORD_INPUT)
+        password_field = login_page.find_element_cached(login_page.PASSWORD_INPUT)
         password_type = password_field.get_attribute("type")
         assert password_type == "password", "Password field should be masked"
         
         # Test that form submission doesn't expose credentials in URL
-        login_page.login(
+        result = login_page.submit_and_observe(
             email=test_user_data["email"],
             password=test_user_data["password"]
         )
         
-        current_url = driver.current_url
+        current_url = result["url"]
         assert test_user_data["password"] not in current_url, "Password should not appear in URL"
         assert test_user_data["email"] not in current_url, "Email should not appear in URL"
         
@@ -1,50 +1,98 @@
 import pytest
-import time
+from selenium.webdriver.support import expected_conditions as EC
 from pages.login_page import LoginPage
 from pages.home_page import HomePage
 from config.config import Config
 
+# Keep the module on one xdist worker (--dist=loadgroup); account-mutating tests use "auth"
+pytestmark = pytest.mark.xdist_group("login_registration")
+
+_TOGGLE_CHECKBOX_SCRIPT = """
+    const el = document.querySelector(arguments[0]);
+    const before = el.checked;
+    el.click();
+    const changed = el.checked !== before;
+    el.click();
+    return changed;
+"""
+
+def _wait_for_response(login_page, url_before, timeout=5):
+    """Wait until a submit shows a message, navigates, or is blocked by browser validation"""
+    return login_page.wait_until(EC.any_of(
+        EC.visibility_of_element_located(login_page.SUCCESS_MESSAGE),
+        EC.visibility_of_element_located(login_page.ERROR_MESSAGE),
+        EC.url_changes(url_before),
+        lambda d: d.execute_script(
+            "const form = document.activeElement && document.activeElement.form;"
+            "return !!(form && form.querySelector(':invalid'));"
+        )
+    ), timeout)
+
+def _wait_for_register_form(login_page, timeout=5):
+    """Wait for the registration form to appear after switching tabs"""
+    return login_page.wait_until(EC.visibility_of_element_located(login_page.REGISTER_EMAIL), timeout)
+
+def _restore_after(request, login_page):
+    """Clear cookies and reopen the login page once a test that submits or switches forms ends"""
+    def restore():
+        login_page.driver.delete_all_cookies()
+        login_page.load()
+    request.addfinalizer(restore)
+
+@pytest.fixture(scope="class")
+def logged_out_login_page(headless_session_driver):
+    """Login page opened once, signed out, and shared by the tests in the class"""
+    headless_session_driver.delete_all_cookies()
+    login_page = LoginPage(headless_session_driver)
+    login_page.load()
+    return login_page
+
+# Nothing here checks images, so the whole class runs on the lean headless browser
 @pytest.mark.critical
+@pytest.mark.headless
 class TestLoginRegistration:
     """Test cases for login and registration functionality"""
     
-    def test_login_page_loads(self, driver):
+    def test_login_page_loads(self, logged_out_login_page):
         """Test that login page loads successfully"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
         
-        assert login_page.is_login_page_loaded(), "Login page did not load successfully"
+        assert login_page.is_loaded(), "Login page did not load successfully"
         
-    def test_login_page_elements_visibility(self, driver):
+    def test_login_page_elements_visibility(self, logged_out_login_page):
         """Test that all login form elements are visible"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
         
         # Check for login form elements
-        elements_to_check = [
-            (login_page.LOGIN_EMAIL_INPUT, "Email input"),
-            (login_page.LOGIN_PASSWORD_INPUT, "Password input"),
-            (login_page.LOGIN_BUTTON, "Login button")
-        ]
+        visible = login_page.probe_elements({
+            "Email input": login_page.EMAIL_INPUT,
+            "Password input": login_page.PASSWORD_INPUT,
+            "Login button": login_page.LOGIN_BUTTON
+        })
         
-        for element_locator, element_name in elements_to_check:
-            if login_page.is_element_visible(element_locator, timeout=5):
-                assert True, f"{element_name} is visible"
-            else:
+        for element_name, is_visible in visible.items():
+            if not is_visible:
                 pytest.skip(f"{element_name} not found - may not be available on this page")
                 
+    @pytest.mark.xdist_group("auth")
     def test_valid_user_registration(self, driver, test_user_data):
         """Test user registration with valid data"""
         login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page.load()
         
-        # Check if registration is available
-        if not login_page.is_element_visible(login_page.REGISTER_EMAIL, timeout=5):
-            if login_page.is_element_visible(login_page.REGISTER_TAB, timeout=3):
-                login_page.click_element(login_page.REGISTER_TAB)
-                time.sleep(1)
+        # Check if registration is available, switching to its tab if needed
+        visible = login_page.probe_elements({
+            "email": login_page.REGISTER_EMAIL,
+            "tab": login_page.REGISTER_TAB
+        })
+        if not visible["email"] and visible["tab"]:
+            login_page.click_element(login_page.REGISTER_TAB)
+            visible["email"] = _wait_for_register_form(login_page)
                 
-        if login_page.is_element_visible(login_page.REGISTER_EMAIL, timeout=5):
+        if visible["email"]:
+            url_before = driver.current_url
             login_page.register(
                 first_name=test_user_data["first_name"],
                 last_name=test_user_data["last_name"],
@@ -53,7 +101,7 @@ class TestLoginRegistration:
                 phone=test_user_data["phone"]
             )
             
-            time.sleep(3)  # Wait for registration process
+            _wait_for_response(login_page, url_before)
             
             # Check for success message or redirect
             success_msg = login_page.get_success_message()
@@ -66,17 +114,20 @@ class TestLoginRegistration:
         else:
             pytest.skip("Registration form not available on this page")
             
-    def test_registration_with_invalid_email(self, driver, invalid_user_data):
+    def test_registration_with_invalid_email(self, request, logged_out_login_page, invalid_user_data):
         """Test registration with invalid email"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
         # Switch to registration if needed
-        if login_page.is_element_visible(login_page.REGISTER_TAB, timeout=3):
+        has_register_tab = login_page.is_element_visible(login_page.REGISTER_TAB, timeout=1)
+        if has_register_tab:
             login_page.click_element(login_page.REGISTER_TAB)
-            time.sleep(1)
+            _wait_for_register_form(login_page)
             
         if login_page.is_element_visible(login_page.REGISTER_EMAIL, timeout=5):
+            url_before = login_page.get_current_url()
             login_page.register(
                 first_name="Test",
                 last_name="User",
@@ -85,26 +136,26 @@ class TestLoginRegistration:
                 phone="+254700123456"
             )
             
-            time.sleep(2)
+            _wait_for_response(login_page, url_before)
             
             # Should show validation error
-            error_msg = login_page.get_error_message()
-            validation_errors = login_page.get_validation_errors()
-            
-            assert error_msg or validation_errors, "Expected validation error for invalid email"
+            assert login_page.any_error_visible(), "Expected validation error for invalid email"
         else:
             pytest.skip("Registration form not available")
             
-    def test_registration_with_weak_password(self, driver, invalid_user_data):
+    def test_registration_with_weak_password(self, request, logged_out_login_page, invalid_user_data):
         """Test registration with weak password"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.REGISTER_TAB, timeout=3):
+        has_register_tab = login_page.is_element_visible(login_page.REGISTER_TAB, timeout=1)
+        if has_register_tab:
             login_page.click_element(login_page.REGISTER_TAB)
-            time.sleep(1)
+            _wait_for_register_form(login_page)
             
         if login_page.is_element_visible(login_page.REGISTER_EMAIL, timeout=5):
+            url_before = login_page.get_current_url()
             login_page.register(
                 first_name="Test",
                 last_name="User",
@@ -113,30 +164,29 @@ class TestLoginRegistration:
                 phone="+254700123456"
             )
             
-            time.sleep(2)
+            _wait_for_response(login_page, url_before)
             
             # Should show validation error
-            error_msg = login_page.get_error_message()
-            validation_errors = login_page.get_validation_errors()
-            
-            assert error_msg or validation_errors, "Expected validation error for weak password"
+            assert login_page.any_error_visible(), "Expected validation error for weak password"
         else:
             pytest.skip("Registration form not available")
             
-    def test_login_with_valid_credentials(self, driver):
+    def test_login_with_valid_credentials(self, request, logged_out_login_page):
         """Test login with valid credentials (demo test)"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.LOGIN_EMAIL_INPUT, timeout=5):
+        if login_page.is_element_visible(login_page.EMAIL_INPUT, timeout=5):
             # Use demo credentials (these will likely fail, but test the process)
+            url_before = login_page.get_current_url()
             login_page.login(
                 email="demo@instylekenya.co.ke",
                 password="demo123",
                 remember_me=True
             )
             
-            time.sleep(3)
+            _wait_for_response(login_page, url_before)
             
             # Check result
             if login_page.is_logged_in():
@@ -147,39 +197,40 @@ class TestLoginRegistration:
         else:
             pytest.skip("Login form not available")
             
-    def test_login_with_empty_credentials(self, driver, invalid_user_data):
+    def test_login_with_empty_credentials(self, request, logged_out_login_page, invalid_user_data):
         """Test login with empty credentials"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.LOGIN_EMAIL_INPUT, timeout=5):
+        if login_page.is_element_visible(login_page.EMAIL_INPUT, timeout=5):
+            url_before = login_page.get_current_url()
             login_page.login(
                 email=invalid_user_data["empty_email"],
                 password=invalid_user_data["empty_password"]
             )
             
-            time.sleep(2)
+            _wait_for_response(login_page, url_before)
             
             # Should show validation error
-            error_msg = login_page.get_error_message()
-            validation_errors = login_page.get_validation_errors()
-            
-            assert error_msg or validation_errors or not login_page.is_logged_in(), "Expected validation error for empty credentials"
+            assert login_page.any_error_visible() or not login_page.is_logged_in(), "Expected validation error for empty credentials"
         else:
             pytest.skip("Login form not available")
             
-    def test_login_with_invalid_credentials(self, driver):
+    def test_login_with_invalid_credentials(self, request, logged_out_login_page):
         """Test login with invalid credentials"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.LOGIN_EMAIL_INPUT, timeout=5):
+        if login_page.is_element_visible(login_page.EMAIL_INPUT, timeout=5):
+            url_before = login_page.get_current_url()
             login_page.login(
                 email="invalid@example.com",
                 password="wrongpassword"
             )
             
-            time.sleep(3)
+            _wait_for_response(login_page, url_before)
             
             # Should show error or not be logged in
             error_msg = login_page.get_error_message()
@@ -189,15 +240,18 @@ class TestLoginRegistration:
         else:
             pytest.skip("Login form not available")
             
-    def test_forgot_password_functionality(self, driver):
+    def test_forgot_password_functionality(self, request, logged_out_login_page):
         """Test forgot password functionality"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.FORGOT_PASSWORD_LINK, timeout=5):
+        has_forgot_link = login_page.is_element_visible(login_page.FORGOT_PASSWORD_LINK, timeout=1)
+        if has_forgot_link:
+            url_before = login_page.get_current_url()
             login_page.forgot_password("test@example.com")
             
-            time.sleep(2)
+            _wait_for_response(login_page, url_before)
             
             # Check for success or error message
             success_msg = login_page.get_success_message()
@@ -207,58 +261,50 @@ class TestLoginRegistration:
         else:
             pytest.skip("Forgot password functionality not available")
             
-    def test_remember_me_functionality(self, driver):
+    def test_remember_me_functionality(self, logged_out_login_page):
         """Test remember me checkbox"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
         
-        if login_page.is_element_visible(login_page.REMEMBER_ME_CHECKBOX, timeout=5):
-            # Test checking the remember me box
-            checkbox = login_page.find_element(login_page.REMEMBER_ME_CHECKBOX)
-            initial_state = checkbox.is_selected()
-            
-            login_page.click_element(login_page.REMEMBER_ME_CHECKBOX)
-            final_state = checkbox.is_selected()
+        has_remember_me = login_page.is_element_visible(login_page.REMEMBER_ME_CHECKBOX, timeout=1)
+        if has_remember_me:
+            # Click the box and compare its state in one call, then click it back
+            # so the shared page is left as the next test expects
+            changed = login_page.driver.execute_script(_TOGGLE_CHECKBOX_SCRIPT, login_page.REMEMBER_ME_CHECKBOX[1])
             
-            assert initial_state != final_state, "Remember me checkbox state did not change"
+            assert changed, "Remember me checkbox state did not change"
         else:
             pytest.skip("Remember me checkbox not available")
             
-    def test_social_login_buttons(self, driver):
+    def test_social_login_buttons(self, logged_out_login_page):
         """Test social login buttons if available"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
-        
-        social_buttons_found = False
+        login_page = logged_out_login_page
+        login_page.clear_form()
         
-        # Check for Google login
-        if login_page.is_element_visible(login_page.GOOGLE_LOGIN, timeout=3):
-            social_buttons_found = True
-            assert True, "Google login button found"
+        # Check for Google and Facebook login in one pass
+        social_buttons = login_page.probe_elements({
+            "google": login_page.GOOGLE_LOGIN,
+            "facebook": login_page.FACEBOOK_LOGIN
+        })
             
-        # Check for Facebook login
-        if login_page.is_element_visible(login_page.FACEBOOK_LOGIN, timeout=3):
-            social_buttons_found = True
-            assert True, "Facebook login button found"
-            
-        if not social_buttons_found:
+        if not any(social_buttons.values()):
             pytest.skip("No social login buttons available")
             
-    def test_navigation_from_login_to_register(self, driver):
+    def test_navigation_from_login_to_register(self, request, logged_out_login_page):
         """Test navigation between login and register forms"""
-        login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page = logged_out_login_page
+        login_page.clear_form()
+        _restore_after(request, login_page)
         
-        if login_page.is_element_visible(login_page.REGISTER_TAB, timeout=5):
+        has_register_tab = login_page.is_element_visible(login_page.REGISTER_TAB, timeout=1)
+        if has_register_tab:
             # Click register tab
             login_page.click_element(login_page.REGISTER_TAB)
-            time.sleep(1)
             
             # Check if register form elements appear
-            register_form_visible = (
-                login_page.is_element_visible(login_page.REGISTER_EMAIL, timeout=3) or
-                login_page.is_element_visible(login_page.REGISTER_BUTTON, timeout=3)
-            )
+            register_form_visible = _wait_for_register_form(login_page)
+            if not register_form_visible:
+                register_form_visible = login_page.is_element_visible(login_page.REGISTER_BUTTON, timeout=0)
             
             assert register_form_visible, "Register form did not appear after clicking register tab"
         else:
@@ -268,29 +314,14 @@ class TestLoginRegistration:
     def test_form_validation_messages(self, driver):
         """Test form validation messages"""
         login_page = LoginPage(driver)
-        login_page.open_login_page()
+        login_page.load()
         
-        # Try submitting login form without data
+        # Submit invalid data once; the empty form is covered by test_login_with_empty_credentials
         if login_page.is_element_visible(login_page.LOGIN_BUTTON, timeout=5):
-            login_page.click_element(login_page.LOGIN_BUTTON)
-            time.sleep(1)
-            
-            # Check for validation messages
-            validation_errors = login_page.get_validation_errors()
-            error_msg = login_page.get_error_message()
+            url_before = driver.current_url
+            login_page.login("invalid", "test")
+            _wait_for_response(login_page, url_before)
             
-            # Should have some form of validation
-            has_validation = len(validation_errors) > 0 or error_msg
-            
-            if not has_validation:
-                # Try with invalid data to trigger validation
-                login_page.login("invalid", "test")
-                time.sleep(1)
-                
-                validation_errors = login_page.get_validation_errors()
-                error_msg = login_page.get_error_message()
-                has_validation = len(validation_errors) > 0 or error_msg
-                
-            assert has_validation, "Form should show validation messages"
+            assert login_page.any_error_visible(), "Form should show validation messages"
         else:
             pytest.skip("Login form not available for validation testing")
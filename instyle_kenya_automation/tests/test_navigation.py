@@ -1,21 +1,33 @@
 """Navigation and general site functionality tests"""
 
+import re
 import pytest
 import logging
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
 from pages.home_page import HomePage
 from pages.cart_page import CartPage
 from pages.wishlist_page import WishlistPage
 from pages.login_page import LoginPage
 from pages.registration_page import RegistrationPage
 from config.config import Config
+from utils import helpers
 
 logger = logging.getLogger(__name__)
 
+# Signs of a 404 page in its title or source ("not found" also matches "page not found")
+_ERROR_PAGE_RE = re.compile(r"404|not found|error", re.IGNORECASE)
+
+# Keep the module on one xdist worker (--dist=loadgroup) so its tests reuse one warm browser;
+# nothing here checks images, so the lean headless browser is enough
+pytestmark = [pytest.mark.xdist_group("navigation"), pytest.mark.headless]
+
 class TestNavigation:
     """Test suite for navigation and general site functionality"""
     
     @pytest.mark.navigation
     @pytest.mark.smoke
+    @pytest.mark.needs_images  # clicks the logo image, which needs a rendered size
     def test_homepage_navigation(self, driver):
         """Test basic navigation to homepage"""
         home_page = HomePage(driver)
@@ -24,9 +36,7 @@ class TestNavigation:
         assert home_page.is_loaded(), "Homepage should load successfully"
         
         # Test logo click (should return to homepage)
-        if home_page.is_element_present(home_page.LOGO):
-            logo_element = home_page.find_element(home_page.LOGO)
-            logo_element.click()
+        if home_page.click_if_present(home_page.LOGO):
             home_page.wait_for_page_load()
             
             assert home_page.is_loaded(), "Clicking logo should return to homepage"
@@ -36,8 +46,10 @@ class TestNavigation:
     
     @pytest.mark.navigation
     @pytest.mark.smoke
-    def test_main_navigation_links(self, driver, product_categories):
+    @pytest.mark.parametrize("category_index", range(2))  # Test first 2 categories
+    def test_main_navigation_links(self, driver, product_categories, category_index):
         """Test main navigation menu links"""
+        category = product_categories[category_index]
         home_page = HomePage(driver)
         home_page.load()
         
@@ -46,16 +58,14 @@ class TestNavigation:
         
         logger.info(f"Found navigation links: {navigation_links}")
         
-        # Test category navigation
-        for category in product_categories[:2]:  # Test first 2 categories
-            home_page.load()  # Return to homepage
-            
-            success = home_page.click_product_category(category.lower())
-            if success:
-                current_url = driver.current_url
-                logger.info(f"Successfully navigated to {category}: {current_url}")
-            else:
-                logger.warning(f"Could not navigate to {category} category")
+        # Test category navigation: read the menu link, then visit it directly
+        url = home_page.get_category_urls([category])[category]
+        if url:
+            home_page.go_to(url)
+            current_url = driver.current_url
+            logger.info(f"Successfully navigated to {category}: {current_url}")
+        else:
+            logger.warning(f"Could not navigate to {category} category")
     
     @pytest.mark.navigation
     def test_user_account_navigation(self, driver):
@@ -64,25 +74,23 @@ class TestNavigation:
         home_page.load()
         
         # Test login link
-        if home_page.is_element_present(home_page.LOGIN_LINK):
-            success = home_page.click_login_link()
-            if success:
-                login_page = LoginPage(driver)
-                assert login_page.is_loaded(), "Should navigate to login page"
-                logger.info("Login navigation works correctly")
+        if home_page.click_if_present(home_page.LOGIN_LINK):
+            home_page.wait_for_page_load()
+            login_page = LoginPage(driver)
+            assert login_page.is_loaded(), "Should navigate to login page"
+            logger.info("Login navigation works correctly")
             
             # Return to homepage
             home_page.load()
         
         # Test registration link
-        if home_page.is_element_present(home_page.REGISTER_LINK):
-            success = home_page.click_register_link()
-            if success:
-                registration_page = RegistrationPage(driver)
-                if registration_page.is_loaded():
-                    logger.info("Registration navigation works correctly")
-                elif "login" in driver.current_url.lower():
-                    logger.info("Register link redirected to login (normal behavior)")
+        if home_page.click_if_present(home_page.REGISTER_LINK):
+            home_page.wait_for_page_load()
+            registration_page = RegistrationPage(driver)
+            if registration_page.is_loaded():
+                logger.info("Registration navigation works correctly")
+            elif "login" in driver.current_url.lower():
+                logger.info("Register link redirected to login (normal behavior)")
         
         logger.info("User account navigation test completed")
     
@@ -93,27 +101,25 @@ class TestNavigation:
         home_page.load()
         
         # Test cart navigation
-        if home_page.is_element_present(home_page.CART_LINK):
-            success = home_page.click_cart_link()
-            if success:
-                cart_page = CartPage(driver)
-                assert cart_page.is_loaded(), "Should navigate to cart page"
-                logger.info("Cart navigation works correctly")
+        if home_page.click_if_present(home_page.CART_LINK):
+            home_page.wait_for_page_load()
+            cart_page = CartPage(driver)
+            assert cart_page.is_loaded(), "Should navigate to cart page"
+            logger.info("Cart navigation works correctly")
             
             # Return to homepage
             home_page.load()
         
         # Test wishlist navigation
-        if home_page.is_element_present(home_page.WISHLIST_LINK):
-            success = home_page.click_wishlist_link()
-            if success:
-                current_url = driver.current_url.lower()
-                if "wishlist" in current_url:
-                    wishlist_page = WishlistPage(driver)
-                    assert wishlist_page.is_loaded(), "Should navigate to wishlist page"
-                    logger.info("Wishlist navigation works correctly")
-                elif "login" in current_url:
-                    logger.info("Wishlist requires login (normal behavior)")
+        if home_page.click_if_present(home_page.WISHLIST_LINK):
+            home_page.wait_for_page_load()
+            current_url = driver.current_url.lower()
+            if "wishlist" in current_url:
+                wishlist_page = WishlistPage(driver)
+                assert wishlist_page.is_loaded(), "Should navigate to wishlist page"
+                logger.info("Wishlist navigation works correctly")
+            elif "login" in current_url:
+                logger.info("Wishlist requires login (normal behavior)")
         
         logger.info("Cart and wishlist navigation test completed")
     
@@ -162,34 +168,41 @@ class TestNavigation:
         home_page.load()
         
         if home_page.is_element_present(home_page.FOOTER):
-            footer_links = home_page.find_elements(home_page.FOOTER_LINKS)
+            # Snapshot text and href once, so the homepage need not be reloaded between links
+            footer_links = home_page.js_collect(home_page.FOOTER_LINKS, {
+                "text": (None, "innerText"),
+                "href": (None, "href")
+            })
             
             if len(footer_links) > 0:
                 logger.info(f"Found {len(footer_links)} footer links")
                 
-                # Test first few footer links
-                for i, link in enumerate(footer_links[:3]):
-                    try:
-                        link_text = link.text
-                        link_url = link.get_attribute("href")
-                        
-                        if link_url and link_text:
-                            logger.info(f"Footer link {i+1}: '{link_text}' -> {link_url}")
-                            
-                            # Click link and verify navigation
-                            link.click()
-                            home_page.wait_for_page_load()
-                            
-                            current_url = driver.current_url
-                            if current_url != Config.BASE_URL:
-                                logger.info(f"Footer link navigation successful: {current_url}")
-                            
-                            # Return to homepage
-                            home_page.load()
-                    
-                    except Exception as e:
-                        logger.warning(f"Could not test footer link {i+1}: {str(e)}")
-                        continue
+                # Check every distinct page link over HTTP; mailto:, tel: and
+                # javascript: links have no page to load
+                link_urls = list(dict.fromkeys(
+                    link["href"].split("#")[0] for link in footer_links
+                    if link["href"] and link["href"].startswith("http")
+                ))
+                statuses = helpers.TestHelpers.get_link_statuses(
+                    link_urls, user_agent=driver.execute_script("return navigator.userAgent;")
+                )
+                
+                site = urlparse(Config.BASE_URL).netloc
+                broken = []
+                for link_url, status in statuses.items():
+                    if 200 <= status < 400:
+                        logger.info(f"Footer link OK ({status}): {link_url}")
+                    elif urlparse(link_url).netloc == site:
+                        # Our own pages must answer the checker, blocked or not
+                        broken.append(f"{link_url} ({status})")
+                    elif status in (0, 403, 429):
+                        # Off-site bot protection and rate limiting say nothing about the link itself
+                        logger.warning(f"Footer link check inconclusive ({status}): {link_url}")
+                    else:
+                        # Social networks often refuse scripted requests; don't fail on them
+                        logger.warning(f"External footer link returned {status}: {link_url}")
+                
+                assert not broken, f"Broken footer links: {broken}"
             else:
                 logger.info("No footer links found")
         else:
@@ -237,16 +250,11 @@ class TestNavigation:
         
         # Navigate to cart
         if home_page.click_cart_link():
-            cart_page = CartPage(driver)
-            cart_url = driver.current_url
-            
-            # Use browser back button
-            driver.back()
-            home_page.wait_for_page_load()
+            # Go back in history; returns as soon as the homepage is restored
+            returned = home_page.history_back_to(homepage_url, timeout=5)
             
             # Should be back on homepage
-            current_url = driver.current_url
-            assert current_url == homepage_url, "Back button should return to homepage"
+            assert returned, "Back button should return to homepage"
             logger.info("Back button functionality works correctly")
         else:
             logger.warning("Could not test back button - cart navigation failed")
@@ -276,23 +284,17 @@ class TestNavigation:
                 ".navbar-toggler"
             ]
             
-            mobile_menu_found = False
-            for selector in mobile_menu_selectors:
-                try:
-                    from selenium.webdriver.common.by import By
-                    mobile_menu = driver.find_element(By.CSS_SELECTOR, selector)
-                    if mobile_menu.is_displayed():
-                        mobile_menu_found = True
-                        logger.info(f"Mobile menu found: {selector}")
-                        
-                        # Try clicking mobile menu
-                        mobile_menu.click()
-                        logger.info("Mobile menu clicked successfully")
-                        break
-                except:
-                    continue
+            # One query for all candidates; an empty list just means no mobile menu
+            candidates = driver.find_elements(By.CSS_SELECTOR, ", ".join(mobile_menu_selectors))
+            mobile_menu = next((candidate for candidate in candidates if candidate.is_displayed()), None)
             
-            if not mobile_menu_found:
+            if mobile_menu:
+                logger.info("Mobile menu found")
+                
+                # Try clicking mobile menu
+                mobile_menu.click()
+                logger.info("Mobile menu clicked successfully")
+            else:
                 logger.info("No mobile menu found (navigation might be always visible)")
             
             # Test tablet size
@@ -307,7 +309,11 @@ class TestNavigation:
     
     @pytest.mark.navigation
     @pytest.mark.regression
-    def test_page_loading_states(self, driver):
+    @pytest.mark.parametrize("page_name,click_method", [
+        ("cart", "click_cart_link"),
+        ("login", "click_login_link")
+    ])
+    def test_page_loading_states(self, driver, page_name, click_method):
         """Test page loading states and performance"""
         import time
         
@@ -318,27 +324,20 @@ class TestNavigation:
         home_page.load()
         load_time = time.time() - start_time
         
-        assert load_time < 10, f"Homepage should load within 10 seconds, took {load_time:.2f}s"
+        # load() returns at DOMContentLoaded (eager strategy) on the lean headless browser
+        assert load_time < 5, f"Homepage should load within 5 seconds, took {load_time:.2f}s"
         logger.info(f"Homepage load time: {load_time:.2f}s")
         
-        # Test navigation to different pages
-        pages_to_test = [
-            ("cart", lambda: home_page.click_cart_link()),
-            ("login", lambda: home_page.click_login_link())
-        ]
+        # Test navigation to the page
+        start_time = time.time()
+        success = getattr(home_page, click_method)()
         
-        for page_name, navigation_func in pages_to_test:
-            home_page.load()  # Return to homepage
-            
-            start_time = time.time()
-            success = navigation_func()
+        if success:
+            load_time = time.time() - start_time
+            logger.info(f"{page_name.capitalize()} page load time: {load_time:.2f}s")
             
-            if success:
-                load_time = time.time() - start_time
-                logger.info(f"{page_name.capitalize()} page load time: {load_time:.2f}s")
-                
-                # Page should load within reasonable time
-                assert load_time < 15, f"{page_name} page should load within 15 seconds"
+            # Page should load within reasonable time
+            assert load_time < 15, f"{page_name} page should load within 15 seconds"
     
     @pytest.mark.navigation
     def test_url_structure_and_seo(self, driver, search_terms):
@@ -374,15 +373,9 @@ class TestNavigation:
         # Try navigating to non-existent page
         driver.get(f"{Config.BASE_URL}non-existent-page-12345")
         
-        # Check if proper error handling
-        page_title = driver.title.lower()
-        page_source = driver.page_source.lower()
-        
-        # Look for 404 indicators
-        error_indicators = ["404", "not found", "page not found", "error"]
-        
-        has_error_indicator = any(indicator in page_title or indicator in page_source 
-                                for indicator in error_indicators)
+        # Look for 404 indicators, checking the title before fetching the whole page source
+        has_error_indicator = bool(_ERROR_PAGE_RE.search(driver.title) or
+                                   _ERROR_PAGE_RE.search(driver.page_source))
         
         if has_error_indicator:
             logger.info("Proper 404 error handling detected")
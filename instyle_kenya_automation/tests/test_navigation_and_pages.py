@@ -178,7 +178,7 @@ class TestNavigationAndAllPages:
             pytest.skip(f"Mobile menu test failed: {e}")
         finally:
             # Reset window size
-            driver.set_window_size(*Config.BROWSER_WINDOW_SIZE)
+            driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
             
     def test_login_page_accessibility(self, driver):
         """Test login page loads and is accessible"""
@@ -385,4 +385,4 @@ class TestNavigationAndAllPages:
                     pytest.skip(f"Responsive test for {page_name} on {device_type} failed: {e}")
                     
         # Reset to default size
-        driver.set_window_size(*Config.BROWSER_WINDOW_SIZE)
+        driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
@@ -1,16 +1,167 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from webdriver_manager.chrome import ChromeDriverManager
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from config.config import Config
 import logging
 
+logger = logging.getLogger(__name__)
+
+DRIVER_CACHE_DIR = Path.home() / ".wdm"
+PINNED_DRIVER_FILE = DRIVER_CACHE_DIR / "pinned.json"
+
+# Headless browsers start at this viewport; headed ones use Config.WINDOW_WIDTH/HEIGHT
+HEADLESS_WINDOW_SIZE = (1280, 800)
+
 class DriverFactory:
     @staticmethod
-    def create_driver():
-        """Create and return Chrome WebDriver instance."""
+    def create_driver(headless=False, lean=None):
+        """Create and return Chrome WebDriver instance.
+        
+        headless=True starts a lean browser (no GPU, no images) for tests
+        that never look at rendered output. lean defaults to headless; pass
+        headless=True, lean=False for a headless browser that still loads images.
+        """
+        # Selenium is imported here so importing this module stays cheap
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        
+        if lean is None:
+            lean = headless
         options = ChromeOptions()
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+        # driver.get() returns at DOMContentLoaded; use BasePage.wait_for_full_load() when images matter
+        options.page_load_strategy = "eager"
+        if headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size={},{}".format(*HEADLESS_WINDOW_SIZE))
+        if lean:
+            options.add_argument("--disable-gpu")
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            # Block images and notification prompts at the profile level as well
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2
+            })
+            options.add_argument("--disable-extensions")
+            options.add_argument("--disable-features=IsolateOrigins,site-per-process")
+        
+        # Give each pytest-xdist worker its own Chrome profile so parallel browsers don't collide
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker_id:
+            profile = f"chrome-{worker_id}-headless" if lean else f"chrome-{worker_id}"
+            options.add_argument(f"--user-data-dir={os.path.join(tempfile.gettempdir(), profile)}")
+        
+        if Config.REUSE_BROWSER:
+            # Attach to the chromedriver daemon started by run_tests.py
+            return webdriver.Remote(command_executor=Config.CHROMEDRIVER_URL, options=options)
+        
+        # Reuse the pinned chromedriver when it still matches the installed Chrome
+        try:
+            service = ChromeService(DriverFactory._resolve_chromedriver_path())
+        except Exception as e:
+            logger.warning(f"ChromeDriverManager failed: {e}, trying fallback")
+            # Fallback to system PATH
+            service = ChromeService()
+        
+        try:
+            return webdriver.Chrome(service=service, options=options)
+        except OSError as e:
+            # WinError 193 means the cached chromedriver has the wrong architecture
+            if getattr(e, "winerror", None) != 193:
+                raise
+            logger.warning(f"Cached chromedriver is unusable: {e}, downloading a fresh one")
+            DriverFactory._purge_driver_cache()
+            service = ChromeService(DriverFactory._resolve_chromedriver_path())
+            return webdriver.Chrome(service=service, options=options)
+    
+    @staticmethod
+    def _chrome_major_version():
+        """Return the installed Chrome major version, or None if it can't be read"""
+        version = ""
+        try:
+            if platform.system() == "Windows":
+                import winreg
+                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Software\\Google\\Chrome\\BLBeacon") as key:
+                    version = winreg.QueryValueEx(key, "version")[0]
+            else:
+                for binary in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+                    try:
+                        result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10)
+                    except (OSError, subprocess.SubprocessError):
+                        continue
+                    if result.returncode == 0:
+                        version = result.stdout.split()[-1]
+                        break
+        except Exception as e:
+            logger.debug(f"Could not read Chrome version: {e}")
+        
+        major = version.split(".")[0]
+        return int(major) if major.isdigit() else None
+    
+    @staticmethod
+    def _resolve_chromedriver_path() -> str:
+        """Return the pinned chromedriver path, running ChromeDriverManager only when it is stale"""
+        from webdriver_manager.chrome import ChromeDriverManager
+        
+        chrome_major = DriverFactory._chrome_major_version()
+        
+        try:
+            pinned = json.loads(PINNED_DRIVER_FILE.read_text())
+            driver_path = pinned["driver_path"]
+            if (chrome_major is not None and pinned.get("chrome_major") == chrome_major
+                    and os.access(driver_path, os.X_OK)):
+                return driver_path
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        driver_path = ChromeDriverManager().install()
+        try:
+            PINNED_DRIVER_FILE.parent.mkdir(parents=True, exist_ok=True)
+            PINNED_DRIVER_FILE.write_text(json.dumps({
+                "chrome_major": chrome_major,
+                "driver_path": driver_path,
+                "mtime": os.path.getmtime(driver_path),
+            }))
+        except OSError as e:
+            logger.warning(f"Could not pin chromedriver path: {e}")
+        return driver_path
+    
+    @staticmethod
+    def _purge_driver_cache() -> None:
+        """Drop the cached chromedriver and its pin so the next lookup downloads afresh"""
+        shutil.rmtree(DRIVER_CACHE_DIR / "drivers" / "chromedriver", ignore_errors=True)
+        try:
+            PINNED_DRIVER_FILE.unlink()
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def window_size(headless=False):
+        """Return the (width, height) a browser created with this headless flag should have."""
+        return HEADLESS_WINDOW_SIZE if headless else (Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
+    
+    @staticmethod
+    def configure_driver(driver, headless=False):
+        """Apply the page load timeout from Config, and its window size to headed browsers."""
+        # Page objects use explicit waits only; keep the implicit wait off
+        driver.implicitly_wait(0)
+        driver.set_page_load_timeout(Config.PAGE_LOAD_TIMEOUT)
+        # Headless browsers already start at HEADLESS_WINDOW_SIZE via --window-size
+        if not headless:
+            driver.set_window_size(*DriverFactory.window_size())
         
-        service = ChromeService(ChromeDriverManager().install())
-        return webdriver.Chrome(service=service, options=options)
+        # Block analytics, ads and web fonts for every later page load, and keep the
+        # HTTP cache on so repeat loads of the same page are served locally (Chrome only)
+        if hasattr(driver, "execute_cdp_cmd"):
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": Config.BLOCKED_URLS})
+            except Exception as e:
+                logger.warning(f"Could not block third-party URLs: {e}")
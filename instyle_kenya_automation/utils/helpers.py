@@ -1,8 +1,11 @@
 """Common helper functions for tests"""
 
+import os
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Any
+import requests
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -56,6 +59,10 @@ class TestHelpers:
         Returns:
             Path to the saved screenshot
         """
+        # Prefix the pytest-xdist worker id so parallel workers never overwrite each other
+        worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker_id:
+            filename = f"{worker_id}_{filename}"
         screenshot_path = f"screenshots/{filename}"
         try:
             driver.save_screenshot(screenshot_path)
@@ -116,6 +123,48 @@ class TestHelpers:
         
         return results
     
+    @staticmethod
+    def get_link_statuses(links: List[str], max_workers: int = 8, timeout: int = 10,
+                          user_agent: str = None) -> dict:
+        """Check links with concurrent HTTP HEAD requests instead of loading them in the browser
+        
+        Servers that reject HEAD (405/501) are retried with a streamed GET, and a
+        request that fails outright is retried once.
+        
+        Args:
+            links: List of absolute http(s) URLs to check
+            max_workers: Maximum number of requests in flight
+            timeout: Timeout per request in seconds
+            user_agent: User-Agent to send, e.g. the browser's navigator.userAgent,
+                so bot protection treats the requests like the browser's own
+            
+        Returns:
+            Dictionary of URL -> final status code after redirects (0 if the request failed)
+        """
+        session = requests.Session()
+        if user_agent:
+            session.headers["User-Agent"] = user_agent
+        
+        def get_status(link, retries=1):
+            try:
+                response = session.head(link, allow_redirects=True, timeout=timeout)
+                if response.status_code in (405, 501):
+                    response = session.get(link, allow_redirects=True, timeout=timeout, stream=True)
+                    response.close()
+                return response.status_code
+            except requests.RequestException as e:
+                if retries:
+                    logger.warning(f"Retrying link {link} after error: {str(e)}")
+                    return get_status(link, retries - 1)
+                logger.error(f"Error checking link {link}: {str(e)}")
+                return 0
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return dict(zip(links, executor.map(get_status, links)))
+        finally:
+            session.close()
+    
     @staticmethod
     def wait_and_click(driver: WebDriver, locator: tuple, timeout: int = 10) -> bool:
         """Wait for element to be clickable and click it